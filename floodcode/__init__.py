@@ -0,0 +1,47 @@
+"""Flood pattern analysis for MDRRMO flood records.
+
+Reusable pieces of the FloodPattern notebook that the Streamlit app
+(``app.py``) builds on. Submodules are imported on first attribute access,
+so ``import floodcode`` is cheap and the heavy libraries (scikit-learn,
+statsmodels, prophet) load only when the analysis that needs them runs.
+"""
+
+import importlib
+
+__all__ = [
+    "batch",
+    "bench",
+    "calibration",
+    "cleaning",
+    "diagnostics",
+    "dtypes",
+    "explain",
+    "features",
+    "figcache",
+    "forecasting",
+    "imputation",
+    "incremental",
+    "instrument",
+    "ingest",
+    "jobs",
+    "kdd",
+    "memcheck",
+    "models",
+    "pipeline",
+    "plotting",
+    "profiling",
+    "resultcache",
+    "sketches",
+    "synthetic",
+    "timeseries",
+    "tournament",
+    "training",
+    "tuning",
+    "validation",
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,169 @@
+"""Headless batch analysis of a directory of flood record files.
+
+Each CSV/XLSX file is cleaned and run through the risk tables, classifiers,
+clustering and a SARIMA forecast in a process pool. Results go to one
+folder per input file (Parquet tables plus ``summary.json``)::
+
+    python -m floodcode.batch data/ --out results/ --workers 4
+
+Throughput (files/s, rows/s) is printed at the end and written to
+``batch_summary.json`` in the output directory, together with the
+cardinality and top values of the location and cause columns over all files.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from floodcode import cleaning, forecasting, sketches, timeseries
+from floodcode.kdd import run_kdd
+
+INPUT_SUFFIXES = (".csv", ".xlsx")
+
+# Categorical columns sketched while reading, merged over the whole batch
+SKETCH_COLS = ['Municipality', 'Barangay', 'Flood Cause']
+
+
+def find_inputs(directory):
+    """CSV/XLSX files directly inside ``directory``, sorted by name."""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(INPUT_SUFFIXES) and not name.startswith("~$"))
+
+
+def _to_parquet(frame, path):
+    frame = frame.to_frame() if isinstance(frame, pd.Series) else frame.copy()
+    if isinstance(frame.columns, pd.MultiIndex):
+        frame.columns = [" ".join(str(level) for level in col) for col in frame.columns]
+    frame.columns = [str(col) for col in frame.columns]
+    # Spreadsheet columns often mix numbers and text, which Parquet can't store as one type
+    for col in frame.columns[frame.dtypes == object]:
+        frame[col] = frame[col].astype("string")
+    frame.to_parquet(path)
+
+
+def _model_summary(trained):
+    return {"accuracy": float(trained["accuracy"]), "report": trained["report"]}
+
+
+def analyze_file(path, out_dir, cache_dir=None, grid_search=False, n_clusters=3):
+    """Run the full analysis on one file and write its results.
+
+    Returns a summary dict with ``rows``, ``elapsed``, the column
+    ``sketches`` and either the model results or an ``error``; errors are
+    recorded rather than raised so one bad file doesn't stop the batch.
+    """
+    start = time.perf_counter()
+    name = os.path.basename(path)
+    summary = {"file": path, "rows": 0}
+    column_sketches = {}
+    try:
+        with open(path, "rb") as f:
+            raw, column_sketches = sketches.read_with_sketches(f, name, columns=cleaning.ANALYSIS_COLS,
+                                                               sketch_columns=SKETCH_COLS)
+        summary["rows"] = len(raw)
+
+        result = run_kdd(raw, cache_dir=cache_dir, n_clusters=n_clusters)
+        clean_df = result["cleaned"]
+
+        file_dir = os.path.join(out_dir, os.path.splitext(name)[0])
+        os.makedirs(file_dir, exist_ok=True)
+        _to_parquet(clean_df, os.path.join(file_dir, "cleaned.parquet"))
+        _to_parquet(result["monthly_flood_probability"], os.path.join(file_dir, "monthly_risk.parquet"))
+        _to_parquet(result["municipal_flood_probability"], os.path.join(file_dir, "municipal_risk.parquet"))
+        _to_parquet(result["monthly_predictions"], os.path.join(file_dir, "monthly_predictions.parquet"))
+        _to_parquet(result["cluster_summary"], os.path.join(file_dir, "cluster_summary.parquet"))
+
+        # ------------------ FORECAST ------------------
+        ts = timeseries.daily_series(clean_df['Water Level'], timeseries.date_index(clean_df))
+        if grid_search:
+            best = forecasting.grid_search(ts)
+            order, seasonal_order, results = best["order"], best["seasonal_order"], best["results"]
+        else:
+            order, seasonal_order = forecasting.DEFAULT_ORDER, forecasting.DEFAULT_SEASONAL_ORDER
+            results = forecasting.fit_sarimax(ts, order, seasonal_order)
+        future_dates = forecasting.future_index(ts)
+        forecast = results.predict(start=future_dates[0], end=future_dates[-1]).rename("Water Level")
+        _to_parquet(forecast, os.path.join(file_dir, "forecast.parquet"))
+
+        summary.update({
+            "occurrence_model": _model_summary(result["occurrence_model"]),
+            "refined_model": _model_summary(result["refined_model"]),
+            "severity_model": _model_summary(result["severity_model"]),
+            "forecast": {"order": order, "seasonal_order": seasonal_order,
+                         "aic": float(results.aic), "steps": len(forecast)},
+            "columns": sketches.summarize(column_sketches),
+        })
+        with open(os.path.join(file_dir, "summary.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary["elapsed"] = time.perf_counter() - start
+    summary["sketches"] = column_sketches
+    return summary
+
+
+def run_batch(paths, out_dir, max_workers=None, **options):
+    """Analyze ``paths`` in a process pool; returns (summaries, batch summary)."""
+    os.makedirs(out_dir, exist_ok=True)
+    max_workers = max_workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    summaries = []
+    if max_workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(analyze_file, path, out_dir, **options) for path in paths]
+            for future in as_completed(futures):
+                summaries.append(future.result())
+    else:
+        summaries = [analyze_file(path, out_dir, **options) for path in paths]
+
+    wall_time = time.perf_counter() - start
+    rows = sum(summary["rows"] for summary in summaries)
+    merged = sketches.merge_sketches(*(summary.pop("sketches") for summary in summaries))
+    batch = {
+        "files": len(summaries),
+        "failed": [summary["file"] for summary in summaries if "error" in summary],
+        "rows": rows,
+        "wall_time": wall_time,
+        "files_per_second": len(summaries) / wall_time if wall_time else float("nan"),
+        "rows_per_second": rows / wall_time if wall_time else float("nan"),
+        "workers": max_workers,
+        "columns": sketches.summarize(merged),
+    }
+    with open(os.path.join(out_dir, "batch_summary.json"), "w") as f:
+        json.dump(batch, f, indent=2)
+    return summaries, batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the flood analysis over a directory of CSV/XLSX files.")
+    parser.add_argument("input_dir", help="directory containing the CSV/XLSX files")
+    parser.add_argument("--out", default="results", help="output directory (default: results)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache-dir", default=None, help="reuse pipeline outputs cached in this directory")
+    parser.add_argument("--clusters", type=int, default=3, help="number of KMeans clusters (default: 3)")
+    parser.add_argument("--grid-search", action="store_true",
+                        help="pick SARIMA orders by grid search instead of the default orders")
+    args = parser.parse_args(argv)
+
+    paths = find_inputs(args.input_dir)
+    if not paths:
+        parser.error(f"no CSV/XLSX files in {args.input_dir}")
+
+    summaries, batch = run_batch(paths, args.out, max_workers=args.workers, cache_dir=args.cache_dir,
+                                 grid_search=args.grid_search, n_clusters=args.clusters)
+    for summary in sorted(summaries, key=lambda s: s["file"]):
+        status = summary.get("error", "ok")
+        print(f"{summary['file']}: {summary['rows']} rows in {summary['elapsed']:.2f}s ({status})")
+    print(f"{batch['files']} files, {batch['rows']} rows in {batch['wall_time']:.2f}s "
+          f"| {batch['files_per_second']:.2f} files/s | {batch['rows_per_second']:.0f} rows/s")
+    return 1 if batch["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""Benchmarks of the hot paths of the flood analysis.
+
+Times ingestion, cleaning, date indexing/resampling, one-hot encoding,
+KMeans, RandomForest and HistGradientBoosting fit/predict, a SARIMA grid
+search and a SARIMAX forecast on synthetic records, and writes the results
+as JSON so runs on different commits can be compared on the same machine::
+
+    python -m floodcode.bench --rows 100000 --out bench-results/
+    python -m floodcode.bench compare bench-results/old.json bench-results/new.json
+
+The ``models`` command compares the model kinds on every flood model: fit
+time, predict latency, peak fit memory, model size and test accuracy::
+
+    python -m floodcode.bench models --rows 100000
+"""
+
+import argparse
+import io
+import json
+import os
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from floodcode import (cleaning, dtypes, features, forecasting, ingest, memcheck, models, synthetic, timeseries,
+                       training)
+
+# Slowdown reported as a regression by ``compare``
+REGRESSION_THRESHOLD = 1.10
+
+# A smaller SARIMA grid than the app's, so a benchmark run stays in minutes
+BENCH_GRID = dict(p=range(0, 2), d=range(0, 2), q=range(0, 2), P=range(0, 2), D=range(0, 1), Q=range(0, 2))
+
+BENCHMARKS = {}
+
+
+def benchmark(name, setup=None, repeat=None):
+    """Register ``func(data)`` as a benchmark.
+
+    ``setup(data)`` builds the shared inputs it needs before the timing
+    starts; ``repeat`` overrides the run's repeat count, for benchmarks too
+    slow to repeat.
+    """
+    def decorator(func):
+        BENCHMARKS[name] = (func, setup, repeat)
+        return func
+    return decorator
+
+
+class BenchData:
+    """Inputs shared by the benchmarks, built lazily and only once."""
+
+    def __init__(self, rows, municipalities, barangays, seed):
+        self.raw = synthetic.generate(rows, municipalities=municipalities, barangays=barangays, seed=seed)
+        self._cache = {}
+
+    def get(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def csv_bytes(self):
+        return self.get("csv", lambda: self.raw.to_csv(index=False).encode())
+
+    @property
+    def xlsx_bytes(self):
+        def build():
+            buffer = io.BytesIO()
+            self.raw.to_excel(buffer, index=False)
+            return buffer.getvalue()
+        return self.get("xlsx", build)
+
+    @property
+    def clean(self):
+        return self.get("clean", lambda: cleaning.clean(self.raw))
+
+    @property
+    def dates(self):
+        return self.get("dates", lambda: timeseries.date_index(self.clean))
+
+    @property
+    def daily(self):
+        return self.get("daily", lambda: timeseries.daily_series(self.clean['Water Level'], self.dates))
+
+    @property
+    def occurrence(self):
+        return self.get("occurrence", lambda: features.occurrence_features(self.clean, with_location=True))
+
+    @property
+    def forest(self):
+        return self.get("forest", lambda: _fit_forest(*self.occurrence))
+
+    @property
+    def native_occurrence(self):
+        return self.get("native_occurrence",
+                        lambda: features.occurrence_features(self.clean, with_location=True, native=True))
+
+    @property
+    def boosting(self):
+        return self.get("boosting", lambda: models.make_classifier("boosting").fit(*self.native_occurrence))
+
+
+def _fit_forest(X, y):
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(random_state=models.RANDOM_STATE).fit(X, y)
+
+
+# Feature sets of the flood models, one-hot (forest) or native categorical (boosting)
+MODEL_TARGETS = {
+    "occurrence": lambda df, native: features.occurrence_features(df, native=native),
+    "refined": lambda df, native: features.occurrence_features(df, with_location=True, native=native),
+    "severity": lambda df, native: features.severity_features(df, native=native),
+}
+
+
+# ------------------ INGESTION ------------------
+@benchmark("ingest_csv", setup=lambda data: data.csv_bytes)
+def bench_ingest_csv(data):
+    return ingest.read_table(io.BytesIO(data.csv_bytes), "bench.csv")
+
+
+@benchmark("ingest_xlsx", setup=lambda data: data.xlsx_bytes, repeat=1)
+def bench_ingest_xlsx(data):
+    return ingest.read_table(io.BytesIO(data.xlsx_bytes), "bench.xlsx")
+
+
+# ------------------ CLEANING ------------------
+@benchmark("clean_water_level")
+def bench_clean_water_level(data):
+    return cleaning.clean_water_level(data.raw['Water Level'])
+
+
+@benchmark("clean_damage")
+def bench_clean_damage(data):
+    return [cleaning.clean_damage(data.raw[col]) for col in cleaning.DAMAGE_COLS]
+
+
+@benchmark("clean")
+def bench_clean(data):
+    return cleaning.clean(data.raw)
+
+
+# ------------------ TIME SERIES ------------------
+@benchmark("date_index", setup=lambda data: data.clean)
+def bench_date_index(data):
+    return timeseries.date_index(data.clean)
+
+
+@benchmark("daily_resample", setup=lambda data: data.dates)
+def bench_daily_resample(data):
+    return timeseries.daily_series(data.clean['Water Level'], data.dates)
+
+
+# ------------------ FEATURES AND MODELS ------------------
+@benchmark("get_dummies", setup=lambda data: data.clean)
+def bench_get_dummies(data):
+    return features.design_matrix(data.clean)
+
+
+@benchmark("kmeans", setup=lambda data: data.clean)
+def bench_kmeans(data):
+    return models.cluster_events(features.clustering_features(data.clean))
+
+
+@benchmark("random_forest_fit", setup=lambda data: data.occurrence, repeat=1)
+def bench_random_forest_fit(data):
+    return _fit_forest(*data.occurrence)
+
+
+@benchmark("random_forest_predict", setup=lambda data: data.forest)
+def bench_random_forest_predict(data):
+    return data.forest.predict_proba(data.occurrence[0])
+
+
+@benchmark("hist_gradient_boosting_fit", setup=lambda data: data.native_occurrence, repeat=1)
+def bench_hist_gradient_boosting_fit(data):
+    return models.make_classifier("boosting").fit(*data.native_occurrence)
+
+
+@benchmark("hist_gradient_boosting_predict", setup=lambda data: data.boosting)
+def bench_hist_gradient_boosting_predict(data):
+    return data.boosting.predict_proba(data.native_occurrence[0])
+
+
+@benchmark("sarima_grid_search", setup=lambda data: data.daily, repeat=1)
+def bench_sarima_grid_search(data):
+    return forecasting.grid_search(data.daily, candidates=forecasting.sarima_grid(**BENCH_GRID))
+
+
+@benchmark("sarimax_forecast", setup=lambda data: data.daily)
+def bench_sarimax_forecast(data):
+    results = forecasting.fit_sarimax(data.daily, forecasting.DEFAULT_ORDER, forecasting.DEFAULT_SEASONAL_ORDER)
+    future_dates = forecasting.future_index(data.daily)
+    return results.predict(start=future_dates[0], end=future_dates[-1])
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(rows=10_000, municipalities=5, barangays=50, repeat=3, only=None, seed=0, progress=None):
+    """Run the benchmarks and return the results as a JSON-friendly dict."""
+    import sklearn
+    import statsmodels
+
+    data = BenchData(rows, municipalities, barangays, seed)
+    results = {}
+    for name, (func, setup, fixed_repeat) in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        if setup is not None:
+            setup(data)
+        timings = []
+        for _ in range(fixed_repeat or repeat):
+            start = time.perf_counter()
+            func(data)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        results[name] = {"median": median, "min": min(timings), "runs": len(timings),
+                         "rows_per_second": rows / median if median else None}
+        if progress is not None:
+            progress(name, results[name])
+
+    return {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rows": rows,
+            "municipalities": municipalities,
+            "barangays": barangays,
+            "seed": seed,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "statsmodels": statsmodels.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare_models(rows=10_000, municipalities=5, barangays=50, seed=0, kinds=None, latency_rows=1000,
+                   n_jobs=None):
+    """Fit time, predict latency, peak fit memory, model size and accuracy per flood model and kind.
+
+    The records are cleaned and their dtypes optimized as in the app, and
+    every kind is fit through ``training.fit`` on the same train split and
+    scored on the rest. Both kinds get the same core budget, ``n_jobs``
+    (default: ``training.available_cores()``): the forest as its joblib
+    workers, boosting as its OpenMP threads. The fit is timed untraced and
+    then repeated under ``tracemalloc`` for its peak memory; latency is the
+    time to predict ``latency_rows`` rows.
+    """
+    from sklearn.metrics import accuracy_score, f1_score
+    from sklearn.model_selection import train_test_split
+    from threadpoolctl import threadpool_limits
+
+    n_jobs = n_jobs or training.available_cores()
+    raw = synthetic.generate(rows, municipalities=municipalities, barangays=barangays, seed=seed)
+    clean, _ = dtypes.optimize(cleaning.clean(raw))
+    results = []
+    for target, build in MODEL_TARGETS.items():
+        for kind in kinds or models.MODEL_KINDS:
+            X, y = build(clean, kind == "boosting")
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=models.TEST_SIZE,
+                                                                random_state=models.RANDOM_STATE)
+            # HistGradientBoosting has no n_jobs; its OpenMP pool is capped instead
+            with threadpool_limits(limits=n_jobs, user_api="openmp"):
+                start = time.perf_counter()
+                model = training.fit(models.make_classifier(kind), X_train, y_train, n_jobs=n_jobs)
+                fit_seconds = time.perf_counter() - start
+                _, peak = memcheck.peak_memory(training.fit, models.make_classifier(kind), X_train, y_train,
+                                               n_jobs=n_jobs)
+                batch = X_test.iloc[:latency_rows]
+                start = time.perf_counter()
+                training.predict_proba(model, batch)
+                latency = time.perf_counter() - start
+                y_pred = training.predict(model, X_test)
+            results.append({"model": target, "kind": kind, "features": X.shape[1], "n_jobs": n_jobs,
+                            "fit_seconds": fit_seconds,
+                            f"predict_ms_per_{len(batch)}_rows": latency * 1000, "fit_peak_mb": peak / 1e6,
+                            "model_mb": len(pickle.dumps(model)) / 1e6,
+                            "accuracy": accuracy_score(y_test, y_pred),
+                            "macro_f1": f1_score(y_test, y_pred, average="macro", zero_division=0)})
+    return pd.DataFrame(results).set_index(["model", "kind"])
+
+
+def compare(old, new, threshold=REGRESSION_THRESHOLD):
+    """Median time ratios (new / old) of the benchmarks both runs have."""
+    rows = []
+    for name in old["results"]:
+        if name in new["results"]:
+            before, after = old["results"][name]["median"], new["results"][name]["median"]
+            ratio = after / before if before else float("nan")
+            rows.append({"benchmark": name, "old": before, "new": after, "ratio": ratio,
+                         "regression": ratio > threshold})
+    return pd.DataFrame(rows).set_index("benchmark") if rows else pd.DataFrame()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "compare":
+        parser = argparse.ArgumentParser(prog="python -m floodcode.bench compare",
+                                         description="Compare two benchmark result files.")
+        parser.add_argument("old")
+        parser.add_argument("new")
+        parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                            help="new/old ratio reported as a regression (default: 1.10)")
+        args = parser.parse_args(argv[1:])
+        with open(args.old) as f_old, open(args.new) as f_new:
+            table = compare(json.load(f_old), json.load(f_new), args.threshold)
+        print(table.to_string(float_format=lambda value: f"{value:.4f}"))
+        return 1 if table.get("regression", pd.Series(dtype=bool)).any() else 0
+
+    if argv and argv[0] == "models":
+        parser = argparse.ArgumentParser(prog="python -m floodcode.bench models",
+                                         description="Compare the model kinds on the flood models.")
+        parser.add_argument("--rows", type=int, default=10_000, help="synthetic records (default: 10000)")
+        parser.add_argument("--municipalities", type=int, default=5, help="municipalities (default: 5)")
+        parser.add_argument("--barangays", type=int, default=50, help="barangays (default: 50)")
+        parser.add_argument("--seed", type=int, default=0, help="random seed of the generator")
+        parser.add_argument("--jobs", type=int, default=None,
+                            help="cores given to every model kind (default: the available cores)")
+        args = parser.parse_args(argv[1:])
+        table = compare_models(args.rows, args.municipalities, args.barangays, args.seed, n_jobs=args.jobs)
+        print(table.to_string(float_format=lambda value: f"{value:.4f}"))
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark the flood analysis on synthetic data.")
+    parser.add_argument("--rows", type=int, default=10_000, help="synthetic records (default: 10000)")
+    parser.add_argument("--municipalities", type=int, default=5, help="municipalities (default: 5)")
+    parser.add_argument("--barangays", type=int, default=50, help="barangays (default: 50)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the generator")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--out", default="bench-results",
+                        help="JSON file, or directory to write <commit>.json into (default: bench-results)")
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.municipalities, args.barangays, args.repeat, args.only, args.seed,
+                 progress=lambda name, result: print(f"{name:<32} {result['median']:9.4f}s "
+                                                     f"(min {result['min']:.4f}s, {result['runs']} runs)"))
+    path = args.out
+    if not path.endswith(".json"):
+        os.makedirs(path, exist_ok=True)
+        path = os.path.join(path, f"{report['meta']['commit'] or 'results'}-{args.rows}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
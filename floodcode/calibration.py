@@ -0,0 +1,105 @@
+"""Calibration of the classifiers' predicted probabilities.
+
+An overfit forest predicts probabilities near 0 and 1 that do not match
+how often floods actually happen. A :class:`Calibrator` is fit once on
+out-of-fold predictions of the training split (every row is predicted by a
+copy of the model that never saw it), with isotonic regression or Platt
+(sigmoid) scaling per class, and stored as a small lookup table of
+(raw probability, calibrated probability) points. Applying it is one
+``np.interp`` per class, so calibrated scores cost nothing extra at
+inference time::
+
+    calibrator = fit_calibrator(model, X_train, y_train, method="isotonic")
+    probabilities = calibrator.apply(model.predict_proba(X_new))
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from floodcode.models import RANDOM_STATE
+
+METHODS = ["isotonic", "sigmoid"]
+
+# Folds of the out-of-fold predictions the calibrator is fit on
+CALIBRATION_FOLDS = 3
+
+# Points of the lookup table of a sigmoid calibrator
+SIGMOID_POINTS = 101
+
+
+@dataclass
+class Calibrator:
+    """Per-class lookup tables mapping raw to calibrated probabilities."""
+
+    method: str
+    classes: list
+    # Raw probability points and their calibrated values, one array per class;
+    # a binary model has one table, for its second (positive) class
+    points: list = field(default_factory=list)
+    values: list = field(default_factory=list)
+
+    def apply(self, probabilities):
+        """Calibrated ``probabilities`` (rows x classes, in the model's class order)."""
+        probabilities = np.asarray(probabilities, dtype=float)
+        if len(self.classes) == 2:
+            positive = np.interp(probabilities[:, 1], self.points[0], self.values[0])
+            return np.column_stack([1 - positive, positive])
+        calibrated = np.column_stack([np.interp(probabilities[:, c], self.points[c], self.values[c])
+                                      for c in range(len(self.classes))])
+        totals = calibrated.sum(axis=1, keepdims=True)
+        return np.where(totals > 0, calibrated / np.where(totals > 0, totals, 1), probabilities)
+
+
+def _table(method, raw, target):
+    """Lookup table for one class from its out-of-fold probabilities and 0/1 targets."""
+    if method == "isotonic":
+        from sklearn.isotonic import IsotonicRegression
+
+        isotonic = IsotonicRegression(y_min=0, y_max=1, out_of_bounds="clip").fit(raw, target)
+        return isotonic.X_thresholds_, isotonic.y_thresholds_
+    if method == "sigmoid":
+        from sklearn.linear_model import LogisticRegression
+
+        points = np.linspace(0, 1, SIGMOID_POINTS)
+        if target.min() == target.max():
+            return points, np.full(SIGMOID_POINTS, float(target[0]))
+        # Unregularized, as in scikit-learn's sigmoid calibration (the default L2 penalty
+        # flattens the slope on small folds), with Platt's smoothed targets so separable
+        # folds don't give a step function: each row enters as a 1 and a 0 weighted by its target
+        positives = target.sum()
+        smoothed = np.where(target == 1, (positives + 1) / (positives + 2), 1 / (len(target) - positives + 2))
+        platt = LogisticRegression(C=np.inf).fit(np.r_[raw, raw].reshape(-1, 1),
+                                                 np.r_[np.ones(len(raw)), np.zeros(len(raw))],
+                                                 sample_weight=np.r_[smoothed, 1 - smoothed])
+        return points, platt.predict_proba(points.reshape(-1, 1))[:, 1]
+    raise ValueError(f"unknown calibration method {method!r}; expected one of {METHODS}")
+
+
+def out_of_fold_probabilities(model, X, y, folds=CALIBRATION_FOLDS, random_state=RANDOM_STATE):
+    """``predict_proba`` of every row of ``X`` by a copy of ``model`` fit on the other folds."""
+    from sklearn.base import clone
+    from sklearn.model_selection import KFold, StratifiedKFold, cross_val_predict
+
+    stratified = y.value_counts().min() >= folds
+    splitter = (StratifiedKFold if stratified else KFold)(n_splits=folds, shuffle=True, random_state=random_state)
+    return cross_val_predict(clone(model), X, y, cv=splitter, method="predict_proba")
+
+
+def fit_calibrator(model, X, y, method="isotonic", folds=CALIBRATION_FOLDS, random_state=RANDOM_STATE):
+    """Calibrator of ``model``'s probabilities, fit on out-of-fold predictions of ``X``/``y``."""
+    raw = out_of_fold_probabilities(model, X, y, folds, random_state)
+    classes = list(model.classes_)
+    target = np.asarray(y)
+    calibrator = Calibrator(method=method, classes=classes)
+    for c in ([1] if len(classes) == 2 else range(len(classes))):
+        points, values = _table(method, raw[:, c], (target == classes[c]).astype(float))
+        calibrator.points.append(points)
+        calibrator.values.append(values)
+    return calibrator
+
+
+def brier_score(probabilities, y, classes):
+    """Mean squared error of the class probabilities against the one-hot targets."""
+    onehot = (np.asarray(y)[:, None] == np.asarray(classes)[None, :]).astype(float)
+    return float(np.mean(np.sum((np.asarray(probabilities) - onehot) ** 2, axis=1)))
@@ -0,0 +1,96 @@
+"""Cleaning of the raw MDRRMO columns.
+
+Raw columns repeat a handful of distinct entries many times, so the string
+fixes run on the distinct values only and the numbers are broadcast back to
+the rows by their codes; no per-row string copies are made.
+"""
+
+import numpy as np
+import pandas as pd
+
+from floodcode import imputation
+
+NUMERIC_COLS = ['Water Level', 'No. of Families affected', 'Damage Infrastructure', 'Damage Agriculture']
+DAMAGE_COLS = ['Damage Infrastructure', 'Damage Agriculture']
+DATE_COLS = ['Month', 'Day', 'Year']
+
+# Columns the cleaning, models and forecasts need
+ANALYSIS_COLS = NUMERIC_COLS + DATE_COLS + ['Municipality', 'Barangay', 'Flood Cause']
+
+
+def _to_numbers(values, fix):
+    """Numbers from ``values``, applying ``fix`` to the distinct entries only."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype(float)
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    numbers = pd.to_numeric(fix(pd.Series(uniques, dtype=object).astype(str)), errors="coerce")
+    numbers = np.append(numbers.to_numpy(dtype=float), np.nan)
+    # Code -1 (missing) picks the NaN appended at the end
+    return pd.Series(numbers[codes], index=values.index, name=values.name)
+
+
+def clean_water_level(water_level):
+    """Strip the ' ft.'/'ft' units and spaces and convert to numbers.
+
+    Entries that still are not numeric become NaN.
+    """
+    return _to_numbers(water_level, lambda text: (text
+                                                  .str.replace(" ft.", "", regex=False)
+                                                  .str.replace(" ft", "", regex=False)
+                                                  .str.replace(" ", "", regex=False)
+                                                  .str.replace("ft", "", regex=False)))
+
+
+def clean_damage(damage):
+    """Convert a damage column to numbers with the fixes the validator infers.
+
+    Thousands separators (commas, or periods as in '422.510.5') and stray
+    spaces are removed, as listed in ``validation.DAMAGE_FIXES``; entries
+    that still are not numeric become NaN.
+    """
+    # validation takes its column lists from this module
+    from floodcode import validation
+
+    return validation.validate_column(damage, validation.DAMAGE_FIXES)["fixed"].rename(damage.name)
+
+
+def non_numeric_values(column):
+    """Unique non-missing entries of ``column`` that are not numbers."""
+    return column[pd.to_numeric(column, errors="coerce").isna() & column.notna()].unique()
+
+
+def imputation_plan():
+    """How ``clean`` fills each column's missing values."""
+    return {
+        # Typical levels differ between municipalities, so use each one's own median
+        'Water Level': imputation.median_by('Municipality'),
+        'No. of Families affected': imputation.median_by('Municipality'),
+        # A missing damage entry means no damage was reported
+        **{col: imputation.constant(0) for col in DAMAGE_COLS},
+        # Records are in chronological order; fill dates from the same barangay only
+        **{col: imputation.fill_within('Barangay') for col in DATE_COLS},
+    }
+
+
+def clean(df, return_mask=False):
+    """Cleaned copy of the raw flood records.
+
+    - 'Water Level' and 'No. of Families affected' become numeric, missing
+      values filled with the median of the record's municipality.
+    - Damage columns become numeric, missing values filled with 0 (no damage).
+    - 'Month', 'Day' and 'Year' are back-filled (then forward-filled) from
+      the records of the same barangay, assuming chronological order.
+
+    With ``return_mask=True`` a boolean frame of the imputed cells is
+    returned as well.
+    """
+    # Only the replaced columns get new memory; the others are shared with the input
+    df = df.copy(deep=False)
+
+    df['Water Level'] = clean_water_level(df['Water Level'])
+    df['No. of Families affected'] = pd.to_numeric(df['No. of Families affected'], errors='coerce')
+    for col in DAMAGE_COLS:
+        df[col] = clean_damage(df[col])
+
+    mask = imputation.impute(df, imputation_plan(), inplace=True)
+    return (df, mask) if return_mask else df
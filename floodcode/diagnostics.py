@@ -0,0 +1,171 @@
+"""Stationarity and correlogram diagnostics for many series at once.
+
+Replaces the per-series ``adfuller`` / ``plot_acf`` / ``plot_pacf`` cells when
+forecasting per municipality. ADF tests run in a process pool; ACF and PACF
+are computed for all series together with one batched FFT and a vectorized
+Durbin-Levinson recursion. The result is one row per series with the
+recommended differencing order ``d`` and candidate SARIMA orders.
+"""
+
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from floodcode import forecasting
+
+# Lags shown in the notebook's ACF/PACF plots
+DEFAULT_LAGS = 40
+
+# Significance level of the ADF test
+ALPHA = 0.05
+
+# Largest AR/MA order suggested for the grid search
+MAX_ORDER = 2
+
+# Largest differencing order tried
+MAX_D = 2
+
+
+def _adf_orders(values, max_d, alpha):
+    """ADF statistic and p-value on the series and its differences until stationary."""
+    from statsmodels.tsa.stattools import adfuller
+
+    stats = []
+    for d in range(max_d + 1):
+        if len(values) < 10 or np.ptp(values) == 0:
+            stats.append((np.nan, np.nan))
+            break
+        with warnings.catch_warnings():
+            # Degenerate series trigger rank warnings; newer statsmodels also
+            # warns about the tuple return value used here
+            warnings.simplefilter("ignore")
+            adf_result = adfuller(values)
+        stats.append((adf_result[0], adf_result[1]))
+        if adf_result[1] <= alpha:
+            break
+        values = np.diff(values)
+    return stats
+
+
+def acf_fft(series_list, nlags=DEFAULT_LAGS):
+    """Autocorrelations up to ``nlags`` for each 1-D array, as a 2-D array.
+
+    Series are demeaned and zero-padded into one matrix, so a single FFT
+    covers all of them; padding to at least twice the longest series keeps
+    the result identical to the direct estimator.
+    """
+    lengths = np.array([len(x) for x in series_list])
+    size = 1 << int(2 * lengths.max() - 1).bit_length()
+    padded = np.zeros((len(series_list), size))
+    for row, x in enumerate(series_list):
+        padded[row, :len(x)] = x - x.mean()
+
+    spectrum = np.fft.rfft(padded, axis=1)
+    autocov = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=1)[:, :nlags + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        acf = autocov / autocov[:, :1]
+    # Lags beyond a series' length are undefined
+    acf[np.arange(nlags + 1)[None, :] >= lengths[:, None]] = np.nan
+    return acf
+
+
+def pacf_from_acf(acf):
+    """Partial autocorrelations from autocorrelations (Durbin-Levinson), row-wise."""
+    n_series, n_lags = acf.shape[0], acf.shape[1] - 1
+    pacf = np.ones((n_series, n_lags + 1))
+    phi = np.zeros((n_series, n_lags + 1))
+    sigma = np.ones(n_series)
+    for k in range(1, n_lags + 1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            reflection = (acf[:, k] - np.einsum("ij,ij->i", phi[:, 1:k], acf[:, k - 1:0:-1])) / sigma
+        previous = phi[:, 1:k].copy()
+        phi[:, 1:k] = previous - reflection[:, None] * previous[:, ::-1]
+        phi[:, k] = reflection
+        sigma = sigma * (1 - reflection ** 2)
+        pacf[:, k] = reflection
+    return pacf
+
+
+def _cutoff(values, bound, max_order):
+    """Number of leading lags (from lag 1) outside the significance bound."""
+    order = 0
+    for value in values[1:max_order + 1]:
+        if not abs(value) > bound:
+            break
+        order += 1
+    return order
+
+
+def diagnose(series, nlags=DEFAULT_LAGS, alpha=ALPHA, max_d=MAX_D, max_order=MAX_ORDER,
+             seasonal_period=forecasting.SEASONAL_PERIOD, max_workers=None, return_correlograms=False):
+    """Stationarity and order recommendations for many series.
+
+    ``series`` is a mapping of name to Series, or a DataFrame with one series
+    per column. NaNs are dropped before testing. Returns a DataFrame indexed
+    by series name with the ADF results, recommended ``d``, the largest
+    suggested ``p`` and ``q`` and whether the seasonal lag is significant.
+    With ``return_correlograms=True`` the ACF and PACF matrices (one row per
+    series, computed on the differenced series) are returned as well.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = {name: series[name] for name in series.columns}
+    names = list(series)
+    arrays = [np.asarray(pd.Series(series[name]).dropna(), dtype=float) for name in names]
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers > 1 and len(arrays) > 1:
+        # Spawned, not forked: the Streamlit server that calls this is multi-threaded
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            adf = list(pool.map(_adf_orders, arrays, [max_d] * len(arrays), [alpha] * len(arrays),
+                                chunksize=max(1, len(arrays) // (4 * max_workers))))
+    else:
+        adf = [_adf_orders(values, max_d, alpha) for values in arrays]
+
+    differenced = []
+    rows = []
+    for name, values, stats in zip(names, arrays, adf):
+        stationary = [p <= alpha for _, p in stats]
+        if True in stationary:
+            d = stationary.index(True)
+        elif np.isnan(stats[-1][1]):
+            # Too short or constant at this order; differencing further won't help
+            d = len(stats) - 1
+        else:
+            d = max_d
+        stationary_values = np.diff(values, n=d) if len(values) > d else values[:0]
+        differenced.append(stationary_values if len(stationary_values) else np.zeros(1))
+        rows.append({
+            "name": name,
+            "n": len(values),
+            "adf_stat": stats[0][0],
+            "adf_pvalue": stats[0][1],
+            "d": d,
+            "adf_stat_d": stats[min(d, len(stats) - 1)][0],
+            "adf_pvalue_d": stats[min(d, len(stats) - 1)][1],
+        })
+
+    acf = acf_fft(differenced, nlags=nlags)
+    pacf = pacf_from_acf(np.nan_to_num(acf))
+    for row, values, acf_row, pacf_row in zip(rows, differenced, acf, pacf):
+        # Approximate 95% bound, as drawn by plot_acf/plot_pacf
+        bound = 1.96 / np.sqrt(max(len(values), 1))
+        row["p"] = _cutoff(pacf_row, bound, max_order)
+        row["q"] = _cutoff(acf_row, bound, max_order)
+        row["seasonal"] = bool(seasonal_period <= nlags and abs(acf_row[seasonal_period]) > bound)
+
+    table = pd.DataFrame(rows).set_index("name")
+    if return_correlograms:
+        return table, pd.DataFrame(acf, index=names), pd.DataFrame(pacf, index=names)
+    return table
+
+
+def candidate_grid(row, seasonal_period=forecasting.SEASONAL_PERIOD):
+    """SARIMA candidates for one row of :func:`diagnose`, for the grid search."""
+    seasonal = range(0, 2) if row["seasonal"] else [0]
+    return forecasting.sarima_grid(p=range(0, row["p"] + 1), d=[int(row["d"])],
+                                   q=range(0, row["q"] + 1),
+                                   P=seasonal, D=[0], Q=seasonal, s=seasonal_period)
@@ -0,0 +1,92 @@
+"""Downcasting of numeric columns to the smallest safe dtypes.
+
+After cleaning every numeric column is float64 or int64, although 'Day'
+fits in a uint8, 'Year' in a uint16 and most damage amounts in a float32.
+``optimize`` picks per column:
+
+- the smallest unsigned/signed integer type for integer columns, and for
+  float columns without NaNs whose values are all whole numbers;
+- float32 for other float columns when every value survives the round trip
+  within ``rtol``;
+- the original dtype otherwise.
+
+Booleans (e.g. the one-hot dummies) already take one byte and are kept.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Largest relative error accepted when storing a float column as float32
+FLOAT_RTOL = 1e-6
+
+INTEGER_TYPES = [np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32, np.uint64, np.int64]
+
+
+def _smallest_integer(low, high):
+    for dtype in INTEGER_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return None
+
+
+def smallest_dtype(values, rtol=FLOAT_RTOL):
+    """Smallest dtype that holds ``values`` (a numeric Series) without loss."""
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype) or not len(values):
+        return dtype
+    array = values.to_numpy()
+
+    if pd.api.types.is_integer_dtype(dtype):
+        return _smallest_integer(array.min(), array.max()) or dtype
+
+    if pd.api.types.is_float_dtype(dtype):
+        finite = np.isfinite(array)
+        if finite.all() and np.array_equal(array, np.round(array)):
+            target = _smallest_integer(array.min(), array.max())
+            if target is not None:
+                return target
+        if dtype.itemsize > 4:
+            narrowed = array[finite].astype(np.float32).astype(dtype)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                error = np.abs(narrowed - array[finite]) / np.abs(array[finite])
+            error = error[np.isfinite(error)]
+            if not error.size or error.max() <= rtol:
+                return np.dtype(np.float32)
+    return dtype
+
+
+def optimize(df, rtol=FLOAT_RTOL):
+    """Return ``(compact, report)`` for ``df``.
+
+    ``compact`` holds every numeric column in its smallest safe dtype (other
+    columns are passed through untouched). ``report`` lists the columns that
+    changed with their old and new dtype and bytes, and its ``attrs`` hold
+    the total ``bytes_before``/``bytes_after`` of the frame.
+    """
+    columns = {}
+    rows = []
+    for col in df.columns:
+        values = df[col]
+        target = smallest_dtype(values, rtol=rtol)
+        if target != values.dtype:
+            converted = values.astype(target)
+            rows.append({"column": col, "before": str(values.dtype), "after": str(target),
+                         "bytes_before": values.memory_usage(index=False),
+                         "bytes_after": converted.memory_usage(index=False)})
+            values = converted
+        columns[col] = values
+    compact = pd.DataFrame(columns, index=df.index)
+    compact.attrs = dict(df.attrs)
+
+    report = pd.DataFrame(rows, columns=["column", "before", "after", "bytes_before", "bytes_after"])
+    report = report.set_index("column")
+    report.attrs["bytes_before"] = int(df.memory_usage(index=True, deep=True).sum())
+    report.attrs["bytes_after"] = int(compact.memory_usage(index=True, deep=True).sum())
+    return compact, report
+
+
+def saved_fraction(report):
+    """Share of the frame's memory saved by ``optimize``."""
+    before = report.attrs["bytes_before"]
+    return 1 - report.attrs["bytes_after"] / before if before else 0.0
@@ -0,0 +1,136 @@
+"""Targets and feature matrices for the flood models."""
+
+import numpy as np
+import pandas as pd
+
+from floodcode.cleaning import NUMERIC_COLS
+
+SEVERITY_LEVELS = ['Low', 'Medium', 'High']
+
+# Columns used to group similar flood events with KMeans
+CLUSTER_COLS = ['Municipality', 'Barangay', 'Flood Cause'] + NUMERIC_COLS
+
+CATEGORICAL_COLS = ['Month', 'Municipality', 'Barangay', 'Flood Cause']
+
+# Most categories of a native categorical feature (HistGradientBoosting's max_bins)
+MAX_CATEGORIES = 255
+
+# Relative error allowed for a sketched cardinality (about 3 HyperLogLog standard errors)
+SKETCH_MARGIN = 0.05
+
+
+def flood_occurred(df):
+    """1 where a flood was recorded (water level above 0), else 0."""
+    return (df['Water Level'] > 0).astype(np.uint8).rename('flood_occurred')
+
+
+def flood_severity(water_level):
+    """Low (<= 5 ft), Medium (<= 15 ft) or High (> 15 ft) for each water level."""
+    return pd.Series(np.select([water_level <= 5, water_level <= 15], SEVERITY_LEVELS[:2], 'High'),
+                     index=water_level.index, name='Flood_Severity')
+
+
+def month_dummies(df):
+    """One-hot month columns ('Month_JANUARY', ...); missing months are 'Unknown'."""
+    return pd.get_dummies(df['Month'].fillna('Unknown'), prefix='Month')
+
+
+def location_dummies(df):
+    """One-hot 'Municipality_*' and 'Barangay_*' columns."""
+    return pd.concat([pd.get_dummies(df['Municipality'], prefix='Municipality', dummy_na=False),
+                      pd.get_dummies(df['Barangay'], prefix='Barangay', dummy_na=False)], axis=1)
+
+
+def design_matrix(df):
+    """All model features in one frame, built once.
+
+    The numeric columns followed by the 'Month_*', 'Municipality_*',
+    'Barangay_*' and 'Flood Cause_*' dummies. The occurrence, severity and
+    clustering feature sets are column subsets of it, so passing it to them
+    avoids one-hot encoding the same columns again for every model.
+    """
+    categorical = pd.DataFrame({'Month': df['Month'].fillna('Unknown'),
+                                'Municipality': df['Municipality'],
+                                'Barangay': df['Barangay'],
+                                'Flood Cause': df['Flood Cause']}, index=df.index)
+    return pd.concat([df[NUMERIC_COLS], pd.get_dummies(categorical, dummy_na=False)], axis=1)
+
+
+def within_cap(sketch, max_categories=MAX_CATEGORIES):
+    """Whether a column sketched at ingest surely has at most ``max_categories`` values.
+
+    The estimate is padded for its error and for the 'Unknown' of missing
+    months; cleaning only maps values onto ones already in the upload.
+    """
+    return sketch is not None and sketch.cardinality() * (1 + SKETCH_MARGIN) + 1 <= max_categories
+
+
+def native_categoricals(df, columns, max_categories=MAX_CATEGORIES, sketches=None):
+    """``columns`` as pandas categoricals, for models with native categorical support.
+
+    Missing months are 'Unknown'. Columns with more than ``max_categories``
+    values keep the most frequent ones and merge the rest into 'Other'.
+    ``sketches`` (column name to ``ColumnSketch``, built at ingest) spare the
+    counting of columns whose estimated cardinality is safely under the cap.
+    """
+    sketches = sketches or {}
+    result = {}
+    for col in columns:
+        values = df[col].fillna('Unknown') if col == 'Month' else df[col]
+        if not within_cap(sketches.get(col), max_categories):
+            counts = values.value_counts()
+            if len(counts) > max_categories:
+                values = values.where(values.isin(counts.index[:max_categories - 1]), 'Other')
+        result[col] = values.astype(pd.CategoricalDtype(sorted(values.dropna().unique())))
+    return pd.DataFrame(result, index=df.index)
+
+
+def _dummy_columns(matrix, *prefixes):
+    return [col for col in matrix.columns if col.startswith(tuple(f"{prefix}_" for prefix in prefixes))]
+
+
+def occurrence_features(df, with_location=False, matrix=None, native=False, sketches=None):
+    """``(X, y)`` for predicting ``flood_occurred``.
+
+    Numeric columns plus month dummies; ``with_location`` adds the
+    municipality and barangay dummies of the refined model. ``matrix`` is
+    an optional ``design_matrix(df)`` to take the columns from. With
+    ``native=True`` the categories are categorical columns instead of dummies,
+    capped with the help of the ingest ``sketches``.
+    """
+    if native:
+        categorical = ['Month', 'Municipality', 'Barangay'] if with_location else ['Month']
+        X = pd.concat([df[NUMERIC_COLS], native_categoricals(df, categorical, sketches=sketches)], axis=1)
+        return X, flood_occurred(df)
+    if matrix is None:
+        parts = [df[NUMERIC_COLS], month_dummies(df)]
+        if with_location:
+            parts.append(location_dummies(df))
+        return pd.concat(parts, axis=1), flood_occurred(df)
+    prefixes = ['Month', 'Municipality', 'Barangay'] if with_location else ['Month']
+    return matrix[NUMERIC_COLS + _dummy_columns(matrix, *prefixes)], flood_occurred(df)
+
+
+def severity_features(df, matrix=None, native=False, sketches=None):
+    """``(X, y)`` for predicting the flood severity level.
+
+    Water Level defines the target, so it is left out of the features.
+    """
+    features = [col for col in NUMERIC_COLS if col != 'Water Level']
+    if native:
+        X = pd.concat([df[features], native_categoricals(df, ['Month', 'Municipality', 'Barangay'],
+                                                         sketches=sketches)], axis=1)
+    elif matrix is None:
+        X = pd.concat([df[features], month_dummies(df), location_dummies(df)], axis=1)
+    else:
+        X = matrix[features + _dummy_columns(matrix, 'Month', 'Municipality', 'Barangay')]
+    return X, flood_severity(df['Water Level'])
+
+
+def clustering_features(df, matrix=None):
+    """Selected columns with the categorical ones one-hot encoded."""
+    if matrix is not None:
+        return matrix[NUMERIC_COLS + _dummy_columns(matrix, 'Municipality', 'Barangay', 'Flood Cause')]
+    selected = df[CLUSTER_COLS]
+    categorical_cols = selected.select_dtypes(include=['object', 'string']).columns
+    return pd.get_dummies(selected, columns=categorical_cols, dummy_na=False)
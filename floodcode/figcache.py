@@ -0,0 +1,118 @@
+"""Cache of rendered charts shared by all Streamlit sessions.
+
+A chart is identified by the render function, a content hash of the data it
+draws and its plot options, so an unchanged chart is served as stored PNG
+bytes on every rerun and in every session. The cache is bounded by total
+size and evicts the least recently used charts first.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from floodcode.instrument import stage
+
+# Total PNG bytes kept before the least recently used charts are dropped
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Resolution charts are rendered at
+DPI = 100
+
+
+def data_key(*data, **options):
+    """Hash of the given Series/DataFrames/arrays and plot options."""
+    digest = hashlib.sha1()
+    for item in data:
+        if isinstance(item, (pd.Series, pd.DataFrame)):
+            digest.update(pd.util.hash_pandas_object(item, index=True).to_numpy().tobytes())
+            if isinstance(item, pd.DataFrame):
+                layout = (list(item.columns), [str(dtype) for dtype in item.dtypes])
+            else:
+                layout = (item.name, str(item.dtype))
+            digest.update(repr(layout).encode())
+        elif isinstance(item, np.ndarray):
+            digest.update(np.ascontiguousarray(item).tobytes())
+            digest.update(repr((item.dtype, item.shape)).encode())
+        else:
+            digest.update(repr(item).encode())
+    digest.update(repr(sorted(options.items())).encode())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Thread-safe LRU of rendered PNG bytes bounded by ``max_bytes``."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key, png):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = png
+            self._size += len(png)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def render(self, draw, *data, **options):
+        """PNG bytes of ``draw(fig, *data, **options)``, rendered only on a miss.
+
+        ``draw`` fills a fresh matplotlib Figure (no pyplot global state, so
+        sessions can render concurrently). ``figsize`` is taken from the options.
+        """
+        key = data_key(f"{draw.__module__}.{draw.__qualname__}", *data, **options)
+        png = self.get(key)
+        if png is None:
+            from matplotlib.figure import Figure
+
+            with stage(f"plot {draw.__name__}"):
+                fig = Figure(figsize=options.pop("figsize", (12, 7)), dpi=DPI)
+                draw(fig, *data, **options)
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format="png", bbox_inches="tight")
+                png = buffer.getvalue()
+            self.put(key, png)
+        return png
+
+
+# Process-wide cache used by the app
+figure_cache = FigureCache()
+
+
+def cached_figure(draw, *data, **options):
+    """Render through the process-wide :data:`figure_cache`."""
+    return figure_cache.render(draw, *data, **options)
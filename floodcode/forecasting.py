@@ -0,0 +1,120 @@
+"""Water-level forecasting models (SARIMA, SARIMAX with exog, Prophet).
+
+statsmodels and prophet are imported inside the functions that use them so
+importing this module does not pull them in.
+"""
+
+import itertools
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Weekly seasonality, as suggested by the ACF/PACF of the differenced series
+SEASONAL_PERIOD = 7
+
+# Number of days forecast past the end of the history
+FORECAST_STEPS = 30
+
+# The notebook's starting orders from the ACF/PACF analysis, used when no grid search runs
+DEFAULT_ORDER = (1, 1, 1)
+DEFAULT_SEASONAL_ORDER = (1, 0, 1, SEASONAL_PERIOD)
+
+
+def sarima_grid(p=range(0, 3), d=range(0, 3), q=range(0, 3),
+                P=range(0, 2), D=range(0, 2), Q=range(0, 2), s=SEASONAL_PERIOD):
+    """Return the (order, seasonal_order) candidates of the SARIMA grid search."""
+    non_seasonal_pdq = list(itertools.product(p, d, q))
+    seasonal_pdq = [(x[0], x[1], x[2], s) for x in itertools.product(P, D, Q)]
+    return [(order, seasonal) for order in non_seasonal_pdq for seasonal in seasonal_pdq]
+
+
+def fit_sarimax(ts, order, seasonal_order, exog=None):
+    """Fit a SARIMAX model the way the notebook does and return its results."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    model = SARIMAX(ts,
+                    exog=exog,
+                    order=order,
+                    seasonal_order=seasonal_order,
+                    enforce_stationarity=False,
+                    enforce_invertibility=False)
+    with warnings.catch_warnings():
+        # Convergence warnings are expected for many grid candidates
+        warnings.simplefilter("ignore")
+        return model.fit(disp=False)
+
+
+def grid_search(ts, exog=None, candidates=None, callback=None):
+    """Pick the SARIMA orders with the lowest AIC.
+
+    Returns a dict with ``order``, ``seasonal_order``, ``aic`` and the fitted
+    ``results`` of the winner, so it does not have to be refitted. ``callback``
+    is called as ``callback(done, total, best_aic, best_order, best_seasonal_order)``
+    after every candidate; if it returns ``False`` the search stops early with
+    the best so far.
+    """
+    if candidates is None:
+        candidates = sarima_grid()
+
+    best = {"order": None, "seasonal_order": None, "aic": float("inf"), "results": None}
+    total = len(candidates)
+
+    for done, (order, seasonal_order) in enumerate(candidates, start=1):
+        try:
+            results = fit_sarimax(ts, order, seasonal_order, exog=exog)
+        except Exception:
+            # Some orders fail to fit (e.g. singular matrices); skip them
+            results = None
+
+        if results is not None and results.aic < best["aic"]:
+            best = {"order": order, "seasonal_order": seasonal_order,
+                    "aic": float(results.aic), "results": results}
+
+        if callback is not None and callback(done, total, best["aic"],
+                                             best["order"], best["seasonal_order"]) is False:
+            break
+
+    if best["results"] is None:
+        raise ValueError("No SARIMA candidate could be fitted")
+    return best
+
+
+def future_index(ts, steps=FORECAST_STEPS):
+    """Daily dates following the last date of ``ts``."""
+    return pd.date_range(start=ts.index[-1] + pd.Timedelta(days=1), periods=steps, freq="D")
+
+
+def future_exog(exog, steps=FORECAST_STEPS):
+    """Future exogenous values, holding the last known row constant."""
+    last_exog_values = exog.iloc[-1].values.reshape(1, -1)
+    return pd.DataFrame(np.repeat(last_exog_values, steps, axis=0),
+                        index=future_index(exog, steps),
+                        columns=exog.columns)
+
+
+def fit_metrics(actual, fitted):
+    """RMSE and MAE of ``fitted`` against ``actual`` on the fitted index."""
+    actual = actual.reindex(fitted.index)
+    mask = actual.notna().to_numpy() & fitted.notna().to_numpy()
+    errors = actual.to_numpy()[mask] - fitted.to_numpy()[mask]
+    if errors.size == 0:
+        return float("nan"), float("nan")
+    return float(np.sqrt(np.mean(errors ** 2))), float(np.mean(np.abs(errors)))
+
+
+def fit_prophet(ts, steps=FORECAST_STEPS):
+    """Fit Prophet on ``ts`` and return ``(model, fitted, forecast)`` series."""
+    from prophet import Prophet
+
+    # Prophet wants a DataFrame with 'ds' (datetime) and 'y' (water level) columns
+    prophet_df = pd.DataFrame({"ds": ts.index, "y": ts.to_numpy()})
+
+    model_prophet = Prophet()
+    model_prophet.fit(prophet_df)
+
+    future_prophet = model_prophet.make_future_dataframe(periods=steps)
+    yhat = model_prophet.predict(future_prophet).set_index("ds")["yhat"]
+    fitted = yhat.reindex(ts.index)
+    forecast = yhat.loc[yhat.index > ts.index[-1]]
+    return model_prophet, fitted, forecast
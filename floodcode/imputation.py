@@ -0,0 +1,163 @@
+"""Grouped imputation of missing values with NumPy segment operations.
+
+Rows are sorted once by their group code, which turns every group into a
+contiguous segment; medians and forward/backward fills are then computed for
+all groups at once from segment offsets instead of a Python loop over groups.
+
+A plan maps columns to strategies::
+
+    plan = {
+        'Water Level': median_by('Municipality'),
+        'Month': fill_within('Barangay'),
+        'Damage Agriculture': constant(0),
+    }
+    filled, mask = impute(df, plan)
+
+``mask`` is a boolean frame marking the cells that were imputed.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def group_codes(df, by):
+    """Integer code per row for the groups of column(s) ``by``; -1 where a key is missing."""
+    if isinstance(by, str):
+        codes, _ = pd.factorize(df[by], use_na_sentinel=True)
+        return codes
+    codes = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    for col in by:
+        col_codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+        missing |= col_codes < 0
+        codes = codes * (len(uniques) + 1) + col_codes + 1
+    codes = pd.factorize(codes)[0]
+    codes[missing] = -1
+    return codes
+
+
+def _compact(codes):
+    """``codes`` in the smallest signed integer type, so stable sorts can use radix sort."""
+    top = int(codes.max()) if len(codes) else 0
+    for dtype in (np.int8, np.int16, np.int32):
+        if top <= np.iinfo(dtype).max:
+            return codes.astype(dtype, copy=False)
+    return codes
+
+
+def group_order(codes, order=None):
+    """Row positions sorted by group code, keeping ``order`` (default: row order) inside groups."""
+    if order is None:
+        return np.argsort(_compact(codes), kind="stable")
+    return order[np.argsort(_compact(codes)[order], kind="stable")]
+
+
+def segment_medians(values, codes):
+    """Median of the non-missing ``values`` of each group code.
+
+    Returns an array indexed by code; groups without values get NaN.
+    """
+    n_groups = codes.max() + 1 if len(codes) else 0
+    valid = ~np.isnan(values) & (codes >= 0)
+    values, codes = values[valid], codes[valid]
+    # Sort by value, then stably by group, so each group is a sorted segment
+    values = values[group_order(codes, np.argsort(values))]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+    medians = np.full(n_groups, np.nan)
+    has_values = counts > 0
+    low = starts + (counts - 1) // 2
+    high = starts + counts // 2
+    medians[has_values] = (values[low[has_values]] + values[high[has_values]]) / 2
+    return medians
+
+
+def fill_indexer(valid, codes, order):
+    """Row positions whose values fill each row within its group.
+
+    ``order`` lists the row positions grouped by code and in time order
+    inside each group (see ``group_order``). Each row takes the next valid
+    row of its group (backward fill), else the previous one (forward fill);
+    valid rows map to themselves and -1 marks rows with nothing to fill from.
+    """
+    n = len(valid)
+    sorted_codes = codes[order]
+    sorted_valid = valid[order]
+    position = np.arange(n)
+
+    # Segment bounds per row, from the positions where the group code changes
+    new_group = np.empty(n, dtype=bool)
+    new_group[:1] = True
+    new_group[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], n)
+    segment = np.cumsum(new_group) - 1
+
+    following = np.minimum.accumulate(np.where(sorted_valid, position, n)[::-1])[::-1]
+    preceding = np.maximum.accumulate(np.where(sorted_valid, position, -1))
+    source = np.where(following < ends[segment], following,
+                      np.where(preceding >= starts[segment], preceding, -1))
+    # Rows without a group key are never filled
+    source[sorted_codes < 0] = np.where(sorted_valid[sorted_codes < 0], position[sorted_codes < 0], -1)
+
+    indexer = np.empty(n, dtype=np.int64)
+    indexer[order] = np.where(source >= 0, order[np.maximum(source, 0)], -1)
+    return indexer
+
+
+def median_by(by):
+    """Fill with the median of the row's group, or the overall median when the group has none."""
+    def strategy(df, col, missing):
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        codes = group_codes(df, by)
+        medians = segment_medians(values, codes)
+        fill = np.full(len(values), np.nan)
+        grouped = codes >= 0
+        fill[grouped] = medians[codes[grouped]]
+        present = values[~np.isnan(values)]
+        if present.size:
+            fill[np.isnan(fill)] = np.median(present)
+        return pd.Series(np.where(missing, fill, values), index=df.index)
+    return strategy
+
+
+def fill_within(by, order_by=None):
+    """Backward then forward fill within each group, in row order or sorted by ``order_by``."""
+    def strategy(df, col, missing):
+        codes = group_codes(df, by)
+        order = None
+        if order_by is not None:
+            order = np.lexsort([df[key].to_numpy() for key in reversed(list(np.atleast_1d(order_by)))])
+        indexer = fill_indexer(~missing, codes, group_order(codes, order))
+        filled = df[col].take(np.maximum(indexer, 0))
+        filled.index = df.index
+        return filled.where(indexer >= 0)
+    return strategy
+
+
+def constant(value):
+    """Fill with a fixed value."""
+    def strategy(df, col, missing):
+        return df[col].where(~missing, value)
+    return strategy
+
+
+def impute(df, plan, inplace=False):
+    """Apply ``plan`` (column -> strategy) to a copy of ``df``.
+
+    Returns ``(filled, mask)`` where ``mask`` is True for every cell that was
+    missing and got a value. With ``inplace=True`` the columns of ``df`` are
+    replaced instead and only ``mask`` is returned.
+    """
+    filled = df if inplace else df.copy(deep=False)
+    mask = pd.DataFrame(False, index=df.index, columns=list(plan))
+    for col, strategy in plan.items():
+        if col not in df.columns:
+            continue
+        missing = df[col].isna().to_numpy()
+        if not missing.any():
+            continue
+        filled[col] = strategy(df, col, missing)
+        mask[col] = missing & filled[col].notna().to_numpy()
+    return mask if inplace else (filled, mask)
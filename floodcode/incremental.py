@@ -0,0 +1,203 @@
+"""Incremental monthly training of the flood forests.
+
+Refitting a forest on the full history every month costs time in
+proportion to the history. An :class:`IncrementalForest` is fit once and
+then grows ``trees_per_update`` new trees on each month's records only
+(scikit-learn's ``warm_start``); once it holds more than ``max_trees``, the
+oldest trees are retired, so the forest covers a sliding window of recent
+updates::
+
+    forest = IncrementalForest().fit(X_history, y_history)
+    forest.update(X_new_month, y_new_month, batch="2024-07")
+    forest.predict_proba(X)
+
+The feature columns (the month, municipality and barangay dummies) are
+fixed at the first fit: later batches are aligned to them, with absent
+dummies set to False and dummies of categories the forest has never seen
+dropped (they are listed in ``forest.updates``). Every tree must be fit on
+all the classes, so a batch missing a class (e.g. a dry month without a
+'High' flood) is topped up with a few recent rows of that class.
+
+Run monthly from the command line, keeping the forest in a pickle::
+
+    python -m floodcode.incremental forest.pkl 2024-07.xlsx --target severity
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from floodcode import cleaning, features, ingest, training
+from floodcode.models import RANDOM_STATE
+
+# Trees grown on each batch, and the most kept before the oldest are retired
+TREES_PER_UPDATE = 50
+MAX_TREES = 300
+
+# Trees of the first fit on the full history
+INITIAL_TREES = 100
+
+# Recent rows kept per class to top up batches that miss the class
+ANCHORS_PER_CLASS = 50
+
+TARGETS = {
+    "occurrence": lambda df, matrix: features.occurrence_features(df, matrix=matrix),
+    "refined": lambda df, matrix: features.occurrence_features(df, with_location=True, matrix=matrix),
+    "severity": lambda df, matrix: features.severity_features(df, matrix=matrix),
+}
+
+
+class IncrementalForest:
+    """RandomForestClassifier grown with ``warm_start`` over a sliding window of trees."""
+
+    def __init__(self, trees_per_update=TREES_PER_UPDATE, max_trees=MAX_TREES, initial_trees=INITIAL_TREES,
+                 anchors_per_class=ANCHORS_PER_CLASS, random_state=RANDOM_STATE, **params):
+        self.trees_per_update = trees_per_update
+        self.max_trees = max_trees
+        self.initial_trees = initial_trees
+        self.anchors_per_class = anchors_per_class
+        self.random_state = random_state
+        self.params = params
+        self.model = None
+        self.columns = None
+        self.classes_ = None
+        # Batch label of every tree of the model, oldest first
+        self.tree_batches = []
+        self.updates = []
+        self._anchors = None
+
+    def align(self, X):
+        """``X`` with exactly the forest's feature columns, and the unseen columns that were dropped."""
+        unseen = [col for col in X.columns if col not in self.columns]
+        return X.reindex(columns=self.columns, fill_value=False), unseen
+
+    def _keep_anchors(self, X, y):
+        rng = np.random.default_rng(self.random_state + len(self.updates))
+        parts = [] if self._anchors is None else [self._anchors]
+        for cls in self.classes_:
+            rows = np.flatnonzero(y.to_numpy() == cls)
+            if len(rows):
+                chosen = rng.choice(rows, min(len(rows), self.anchors_per_class), replace=False)
+                parts.append(X.iloc[chosen].assign(_target=y.iloc[chosen].to_numpy()))
+        anchors = pd.concat(parts)
+        # Newest rows last; keep the most recent ones of every class
+        self._anchors = anchors.groupby("_target", sort=False).tail(self.anchors_per_class)
+
+    def _top_up(self, X, y):
+        missing = [cls for cls in self.classes_ if not (y == cls).any()]
+        if not missing:
+            return X, y
+        extra = self._anchors[self._anchors["_target"].isin(missing)]
+        return (pd.concat([X, extra[self.columns]], ignore_index=True),
+                pd.concat([y, extra["_target"]], ignore_index=True).rename(y.name))
+
+    def _record(self, batch, rows, new_trees, retired, seconds, unseen=()):
+        self.updates.append({"batch": batch, "rows": rows, "new_trees": new_trees, "retired": retired,
+                             "trees": len(self.model.estimators_), "seconds": seconds,
+                             "unseen_columns": list(unseen)})
+
+    def fit(self, X, y, batch=0):
+        """First fit on the full history; fixes the feature columns and classes."""
+        from sklearn.ensemble import RandomForestClassifier
+
+        start = time.perf_counter()
+        self.columns = list(X.columns)
+        self.classes_ = np.unique(y)
+        self.model = RandomForestClassifier(n_estimators=self.initial_trees, warm_start=True,
+                                            random_state=self.random_state, **self.params)
+        training.fit(self.model, X, y)
+        self.tree_batches = [batch] * self.initial_trees
+        self._keep_anchors(X, y)
+        self._record(batch, len(X), self.initial_trees, 0, time.perf_counter() - start)
+        return self
+
+    def update(self, X, y, batch=None):
+        """Grow ``trees_per_update`` trees on the new records ``X``/``y`` only, then retire the oldest."""
+        if self.model is None:
+            raise RuntimeError("fit the forest before updating it")
+        start = time.perf_counter()
+        batch = len(self.updates) if batch is None else batch
+        X, unseen = self.align(X)
+        unknown = set(pd.unique(y)) - set(self.classes_)
+        if unknown:
+            raise ValueError(f"classes {sorted(map(str, unknown))} were not in the first fit; refit the forest")
+        X_fit, y_fit = self._top_up(X, y)
+
+        self.model.n_estimators = len(self.model.estimators_) + self.trees_per_update
+        # Seeds are drawn by tree position, which retiring trees reuses; vary them per update
+        self.model.random_state = self.random_state + len(self.updates)
+        training.fit(self.model, X_fit, y_fit)
+        self.tree_batches += [batch] * self.trees_per_update
+
+        retired = max(len(self.model.estimators_) - self.max_trees, 0)
+        if retired:
+            self.model.estimators_ = self.model.estimators_[retired:]
+            self.model.n_estimators = len(self.model.estimators_)
+            self.tree_batches = self.tree_batches[retired:]
+        self._keep_anchors(X, y)
+        self._record(batch, len(X), self.trees_per_update, retired, time.perf_counter() - start, unseen)
+        return self
+
+    def predict_proba(self, X):
+        return training.predict_proba(self.model, self.align(X)[0])
+
+    def predict(self, X):
+        return training.predict(self.model, self.align(X)[0])
+
+    def history(self):
+        """One row per fit/update: rows, trees grown and retired, seconds and unseen columns."""
+        return pd.DataFrame(self.updates)
+
+
+def save(forest, path):
+    """Pickle ``forest`` to ``path`` atomically."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(forest, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit a flood forest, or grow it on a new batch of records.")
+    parser.add_argument("model", help="pickle of the forest; created by the first run")
+    parser.add_argument("file", help="CSV/XLSX records: the full history on the first run, a new batch after")
+    parser.add_argument("--target", choices=list(TARGETS), default="occurrence", help="model to train")
+    parser.add_argument("--batch", help="label of the batch (default: update number)")
+    parser.add_argument("--trees", type=int, default=TREES_PER_UPDATE, help="trees grown per update")
+    parser.add_argument("--max-trees", type=int, default=MAX_TREES, help="trees kept in the window")
+    args = parser.parse_args(argv)
+
+    with open(args.file, "rb") as f:
+        clean_df = cleaning.clean(ingest.read_table(f, os.path.basename(args.file)))
+    X, y = TARGETS[args.target](clean_df, features.design_matrix(clean_df))
+
+    if os.path.exists(args.model):
+        forest = load(args.model)
+        forest.trees_per_update, forest.max_trees = args.trees, args.max_trees
+        forest.update(X, y, batch=args.batch)
+    else:
+        forest = IncrementalForest(trees_per_update=args.trees, max_trees=args.max_trees)
+        forest.fit(X, y, batch=args.batch or 0)
+    save(forest, args.model)
+
+    last = forest.updates[-1]
+    print(f"{last['rows']} rows: {last['new_trees']} trees grown, {last['retired']} retired, "
+          f"{last['trees']} in the forest ({last['seconds']:.1f}s)")
+    if last["unseen_columns"]:
+        print(f"Dropped columns unseen by the forest: {', '.join(last['unseen_columns'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
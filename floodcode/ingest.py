@@ -0,0 +1,115 @@
+"""Reading uploaded flood record files.
+
+CSV and Excel files go through the same path: ``iter_chunks`` yields
+DataFrames of at most ``chunksize`` rows holding only the requested columns,
+and ``read_table`` concatenates them. Excel workbooks are streamed with
+openpyxl's read-only mode, so only the rows of the chosen sheet are decoded
+and the workbook is never held in memory as cell objects. When the optional
+``python-calamine`` package is installed, whole workbooks are read with its
+much faster Rust reader instead.
+"""
+
+import codecs
+import importlib.util
+
+import pandas as pd
+
+# Rows per chunk when streaming a file
+CHUNK_ROWS = 50_000
+
+# Bytes decoded at a time when checking a CSV's encoding
+_ENCODING_BLOCK = 1 << 20
+
+
+def _csv_encoding(file):
+    """'utf-8' if the whole file decodes as UTF-8, else 'latin1'.
+
+    Checked up front so a bad byte late in the file can't fail a chunked read
+    after earlier chunks were already used.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        while block := file.read(_ENCODING_BLOCK):
+            decoder.decode(block)
+        decoder.decode(b"", final=True)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin1"
+    finally:
+        file.seek(0)
+
+
+def _iter_csv(file, columns, chunksize):
+    encoding = _csv_encoding(file)
+    usecols = None if columns is None else (lambda col: col in columns)
+    yield from pd.read_csv(file, encoding=encoding, usecols=usecols, chunksize=chunksize)
+
+
+def _header_names(header):
+    """Column names of the header row, named like pandas for empty cells."""
+    return [f"Unnamed: {i}" if value is None else str(value) for i, value in enumerate(header)]
+
+
+def _iter_xlsx(file, sheet, columns, chunksize):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0] if sheet is None else workbook[sheet]
+        rows = worksheet.iter_rows(values_only=True)
+        names = _header_names(next(rows, ()))
+        keep = [i for i, name in enumerate(names) if columns is None or name in columns]
+        kept_names = [names[i] for i in keep]
+
+        values = [[] for _ in keep]
+        yielded = False
+        for row in rows:
+            # Formatting can leave trailing rows with no values
+            if all(value is None for value in row):
+                continue
+            for slot, i in enumerate(keep):
+                values[slot].append(row[i] if i < len(row) else None)
+            if keep and len(values[0]) >= chunksize:
+                yield _typed_frame(kept_names, values)
+                values = [[] for _ in keep]
+                yielded = True
+        if not yielded or (keep and values[0]):
+            yield _typed_frame(kept_names, values)
+    finally:
+        workbook.close()
+
+
+def _typed_frame(names, values):
+    """Build a frame column by column so each gets its own inferred dtype."""
+    return pd.DataFrame({name: pd.Series(column, dtype=None if column else object)
+                         for name, column in zip(names, values)})
+
+
+def iter_chunks(file, name, columns=None, sheet=None, chunksize=CHUNK_ROWS):
+    """Yield DataFrames of at most ``chunksize`` rows from a CSV or Excel file.
+
+    ``columns`` limits the result to those names (missing ones are ignored);
+    ``sheet`` picks an Excel sheet by name (default: the first one).
+    """
+    columns = None if columns is None else set(columns)
+    if name.lower().endswith(".csv"):
+        yield from _iter_csv(file, columns, chunksize)
+    else:
+        yield from _iter_xlsx(file, sheet, columns, chunksize)
+
+
+def read_table(file, name, columns=None, sheet=None):
+    """Read a CSV or Excel upload into a DataFrame.
+
+    CSV files are read as UTF-8, or as Latin-1 when they are not valid UTF-8,
+    which covers the spreadsheets exported by the MDRRMO offices.
+    """
+    wanted = None if columns is None else set(columns)
+    usecols = None if wanted is None else (lambda col: col in wanted)
+    if name.lower().endswith(".csv"):
+        # One read is faster than concatenating chunks when the whole file is wanted
+        return pd.read_csv(file, encoding=_csv_encoding(file), usecols=usecols)
+    if importlib.util.find_spec("python_calamine") is not None:
+        return pd.read_excel(file, sheet_name=sheet or 0, usecols=usecols, engine="calamine")
+    chunks = list(iter_chunks(file, name, columns=columns, sheet=sheet))
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
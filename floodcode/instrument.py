@@ -0,0 +1,276 @@
+"""Per-stage timing and memory records.
+
+Wrap an analysis stage in ``stage`` (or decorate it with ``instrumented``)
+to record its wall time, CPU time, peak memory and row count::
+
+    with stage("cleaning", rows=len(df)):
+        clean_df = cleaning.clean(df)
+
+    @instrumented("fit severity model")
+    def fit(X, y): ...
+
+Records are kept by the process-wide ``recorder``. CPU time is that of the
+thread running the stage, so concurrent sessions don't add to each other's
+(work the stage hands to other threads or processes is not included). Peak
+memory is measured with ``tracemalloc`` when it is tracing
+(``Recorder(trace_memory=True)`` or the FLOODCODE_TRACE_MEMORY environment
+variable turns it on; it slows NumPy and pandas down noticeably). The traced
+peak is process-wide, so a stage that overlaps a traced stage in another
+thread (another session) records no peak rather than a mixed one; the
+process's maximum resident set size is recorded in any case. Records can also be written as JSON log lines
+(FLOODCODE_METRICS_LOG=1) and exported in the Prometheus text format; the
+export reads running totals per stage, which only ever grow, rather than the
+bounded record buffer.
+"""
+
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Records kept before the oldest are dropped
+MAX_RECORDS = 1000
+
+logger = logging.getLogger("floodcode.metrics")
+
+
+@dataclass
+class StageRecord:
+    """One run of a stage. Times are in seconds, memory in bytes.
+
+    ``cpu`` is the CPU time of the stage's thread; ``peak_memory`` is None
+    when memory was not traced or another thread ran a traced stage meanwhile.
+    """
+
+    name: str
+    wall: float
+    cpu: float
+    peak_memory: int = None
+    max_rss: int = None
+    rows: int = None
+    started: float = 0.0
+    thread: int = 0
+    error: str = None
+
+
+class StageHandle:
+    """What a ``stage`` block sees; set ``rows`` when the count is only known inside."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+
+def _max_rss():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _row_count(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+class Recorder:
+    """Thread-safe, bounded store of StageRecords, with unbounded running totals per stage."""
+
+    def __init__(self, max_records=MAX_RECORDS, trace_memory=None, log=None):
+        if trace_memory is None:
+            trace_memory = bool(os.environ.get("FLOODCODE_TRACE_MEMORY"))
+        if log is None:
+            log = bool(os.environ.get("FLOODCODE_METRICS_LOG"))
+        self.trace_memory = trace_memory
+        self.log = log
+        self._records = deque(maxlen=max_records)
+        self._count = 0
+        # Stage name -> calls, wall, cpu, rows and peak_memory of every record ever added
+        self._totals = {}
+        self._lock = threading.Lock()
+        # Per-thread stack of open stages' highest traced peaks, which a nested
+        # stage's reset_peak would otherwise lose
+        self._local = threading.local()
+        # Open traced stages -> [thread, overlapped by a traced stage of another thread]
+        self._traced = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    def mark(self):
+        """Position to pass to ``records(since=...)`` to get only later records."""
+        return self._count
+
+    def records(self, since=0, thread=None):
+        """Records added after ``mark()`` returned ``since``, optionally of one thread only."""
+        with self._lock:
+            first = self._count - len(self._records)
+            selected = list(self._records)[max(since - first, 0):]
+        if thread is not None:
+            selected = [record for record in selected if record.thread == thread]
+        return selected
+
+    def to_frame(self, since=0, thread=None):
+        return pd.DataFrame([asdict(record) for record in self.records(since, thread)],
+                            columns=list(StageRecord.__dataclass_fields__))
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._count = 0
+            self._totals.clear()
+
+    def _add(self, record):
+        with self._lock:
+            self._records.append(record)
+            self._count += 1
+            totals = self._totals.setdefault(record.name, {"calls": 0, "wall": 0.0, "cpu": 0.0, "rows": None,
+                                                           "peak_memory": None})
+            totals["calls"] += 1
+            totals["wall"] += record.wall
+            totals["cpu"] += record.cpu
+            if record.rows is not None:
+                totals["rows"] = (totals["rows"] or 0) + record.rows
+            if record.peak_memory is not None:
+                totals["peak_memory"] = max(totals["peak_memory"] or 0, record.peak_memory)
+        if self.log:
+            logger.info(json.dumps(asdict(record)))
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        handle = StageHandle(rows)
+        tracing = self.trace_memory
+        if tracing and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        baseline = 0
+        if tracing:
+            token, thread = object(), threading.get_ident()
+            with self._lock:
+                others = [entry for entry in self._traced.values() if entry[0] != thread]
+                for entry in others:
+                    entry[1] = True
+                self._traced[token] = [thread, bool(others)]
+            peaks = self._local.__dict__.setdefault("peaks", [])
+            baseline, peak_so_far = tracemalloc.get_traced_memory()
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak_so_far)
+            peaks.append(0)
+            tracemalloc.reset_peak()
+
+        started = time.time()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        error = None
+        try:
+            yield handle
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            peak = None
+            if tracing:
+                highest = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if peaks:
+                    peaks[-1] = max(peaks[-1], highest)
+                with self._lock:
+                    overlapped = self._traced.pop(token)[1]
+                # Other threads' allocations and peak resets make the traced peak meaningless
+                if not overlapped:
+                    peak = max(highest - baseline, 0)
+            self._add(StageRecord(name=name, wall=wall, cpu=cpu, peak_memory=peak, max_rss=_max_rss(),
+                                  rows=handle.rows, started=started, thread=threading.get_ident(),
+                                  error=error))
+
+    def instrumented(self, name=None):
+        """Decorator recording each call as a stage.
+
+        The row count is taken from the first DataFrame/Series argument, or
+        from the result when no argument is one.
+        """
+        def decorator(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                rows = next((count for count in map(_row_count, args) if count is not None), None)
+                with self.stage(stage_name, rows) as handle:
+                    result = func(*args, **kwargs)
+                    if handle.rows is None:
+                        handle.rows = _row_count(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def summary(self, since=0, thread=None):
+        """Calls, total wall/CPU time, peak memory and rows per stage name."""
+        frame = self.to_frame(since, thread)
+        if frame.empty:
+            return pd.DataFrame(columns=["calls", "wall", "cpu", "peak_memory", "rows"])
+        return frame.groupby("name", sort=False).agg(calls=("wall", "size"), wall=("wall", "sum"),
+                                                     cpu=("cpu", "sum"), peak_memory=("peak_memory", "max"),
+                                                     rows=("rows", lambda rows: rows.sum(min_count=1)))
+
+    def totals(self):
+        """Calls, wall/CPU time, rows and largest peak memory per stage over every record ever added.
+
+        Unlike ``summary`` these do not shrink when old records leave the
+        bounded buffer, so they are safe to export as counters.
+        """
+        with self._lock:
+            totals = {name: dict(values) for name, values in self._totals.items()}
+        return pd.DataFrame.from_dict(totals, orient="index",
+                                      columns=["calls", "wall", "cpu", "peak_memory", "rows"])
+
+    def prometheus_text(self):
+        """The running totals per stage in the Prometheus text exposition format."""
+        summary = self.totals()
+        metrics = [
+            ("floodcode_stage_calls_total", "counter", "Completed runs of the stage", "calls"),
+            ("floodcode_stage_wall_seconds_total", "counter", "Wall-clock seconds spent in the stage", "wall"),
+            ("floodcode_stage_cpu_seconds_total", "counter", "CPU seconds of the thread running the stage",
+             "cpu"),
+            ("floodcode_stage_rows_total", "counter", "Rows processed by the stage", "rows"),
+            ("floodcode_stage_peak_memory_bytes", "gauge",
+             "Largest traced allocation peak of the stage in runs no other thread's traced stage overlapped",
+             "peak_memory"),
+        ]
+        lines = []
+        for metric, kind, help_text, column in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for stage_name, value in summary[column].items():
+                if pd.notna(value):
+                    label = str(stage_name).replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(f'{metric}{{stage="{label}"}} {float(value):g}')
+        max_rss = _max_rss()
+        if max_rss is not None:
+            lines += ["# HELP floodcode_max_rss_bytes Maximum resident set size of the process",
+                      "# TYPE floodcode_max_rss_bytes gauge", f"floodcode_max_rss_bytes {max_rss}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write ``prometheus_text`` to ``path`` atomically, for a node_exporter textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+recorder = Recorder()
+stage = recorder.stage
+instrumented = recorder.instrumented
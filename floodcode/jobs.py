@@ -0,0 +1,216 @@
+"""Background model fitting for the Streamlit app.
+
+Long fits run in a worker process so the Streamlit script thread only polls
+for progress. Every job has a wall-clock budget that holds whether or not
+anyone polls: the worker stops itself at its next progress report past the
+budget, keeping the best result so far, and a watchdog timer in the server
+terminates it if it is still running shortly after. A job the user cancels
+is terminated too. The last progress report (candidates done and best AIC so
+far) stays available after the job stops.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from floodcode import forecasting
+
+# Seconds a background fit may run before it is killed
+DEFAULT_TIME_BUDGET = 600.0
+
+# Seconds past the budget a worker gets to stop by itself before it is killed
+STOP_GRACE = 5.0
+
+# Fits allowed to run at once across all sessions of the server process
+MAX_ACTIVE_JOBS = 4
+
+# Keyed jobs remembered so other sessions can join them
+MAX_SHARED_JOBS = 16
+
+_active_jobs = set()
+_active_lock = threading.Lock()
+_shared_jobs = OrderedDict()
+_shared_lock = threading.Lock()
+
+
+@dataclass
+class JobStatus:
+    """Snapshot of a job. ``state`` is running, done, error, cancelled or timeout."""
+
+    state: str
+    done: int = 0
+    total: int = 0
+    best_aic: float = float("inf")
+    best: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    result: object = None
+    error: str = None
+
+    @property
+    def running(self):
+        return self.state == "running"
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+
+def _worker(messages, target, args, kwargs, time_budget):
+    """Worker process entry point: run ``target`` and report back on ``messages``."""
+    deadline = time.monotonic() + time_budget
+
+    def progress(done, total, best_aic, **best):
+        messages.put(("progress", done, total, best_aic, best))
+        # Past the budget the target is asked to stop and return what it has
+        return time.monotonic() < deadline
+
+    try:
+        result = target(progress, *args, **kwargs)
+        messages.put(("done" if time.monotonic() < deadline else "timeout", result))
+    except Exception as e:
+        messages.put(("error", f"{type(e).__name__}: {e}"))
+
+
+class FitJob:
+    """A fit running in a background process.
+
+    ``target`` is a module-level function called as
+    ``target(progress, *args, **kwargs)``; it reports progress with
+    ``progress(done, total, best_aic, **best)``, should stop early when that
+    returns False (the budget is spent) and returns the result.
+    """
+
+    def __init__(self, target, args=(), kwargs=None, time_budget=DEFAULT_TIME_BUDGET):
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.time_budget = time_budget
+        self._status = JobStatus(state="pending")
+        self._process = None
+        self._messages = None
+        self._started = None
+        self._watchdog = None
+        # Shared jobs are polled from several sessions' script threads
+        self._lock = threading.RLock()
+
+    def start(self):
+        with _active_lock:
+            _active_jobs.difference_update([job for job in _active_jobs if not job._alive()])
+            if len(_active_jobs) >= MAX_ACTIVE_JOBS:
+                raise RuntimeError("Too many model fits are running; try again shortly")
+            _active_jobs.add(self)
+
+        ctx = multiprocessing.get_context("spawn")
+        self._messages = ctx.Queue()
+        self._process = ctx.Process(target=_worker,
+                                    args=(self._messages, self.target, self.args, self.kwargs,
+                                          self.time_budget),
+                                    daemon=True)
+        self._process.start()
+        self._started = time.monotonic()
+        self._status = JobStatus(state="running")
+        # Enforces the budget even if no session polls the job again
+        self._watchdog = threading.Timer(self.time_budget + STOP_GRACE, self.poll)
+        self._watchdog.daemon = True
+        self._watchdog.start()
+        return self
+
+    def _alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def _drain(self):
+        while True:
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                return
+            kind = message[0]
+            if kind == "progress":
+                _, self._status.done, self._status.total, self._status.best_aic, self._status.best = message
+            elif kind == "done":
+                self._status.state = "done"
+                self._status.result = message[1]
+            elif kind == "timeout":
+                self._status.state = "timeout"
+                self._status.result = message[1]
+                self._status.error = f"exceeded {self.time_budget:.0f}s budget"
+            elif kind == "error":
+                self._status.state = "error"
+                self._status.error = message[1]
+
+    def _stop(self, state, error=None):
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+        self._process.terminate()
+        self._process.join(1)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._status.state = state
+        self._status.error = error
+
+    def poll(self):
+        """Collect progress reports and enforce the time budget. Never blocks."""
+        with self._lock:
+            return self._poll()
+
+    def _poll(self):
+        if self._status.running:
+            self._status.elapsed = time.monotonic() - self._started
+            self._drain()
+            if self._status.running:
+                if self._status.elapsed >= self.time_budget + STOP_GRACE:
+                    self._stop("timeout", f"exceeded {self.time_budget:.0f}s budget")
+                elif not self._process.is_alive():
+                    # Messages may still be in flight right after the worker exits
+                    self._drain()
+                    if self._status.running:
+                        self._status.state = "error"
+                        self._status.error = f"worker exited with code {self._process.exitcode}"
+        return self._status
+
+    def cancel(self):
+        """Kill the worker. Progress reported so far is kept."""
+        with self._lock:
+            if self._poll().running:
+                self._stop("cancelled")
+            return self._status
+
+
+def grid_search_target(progress, ts, exog=None, candidates=None):
+    """Job target for :func:`floodcode.forecasting.grid_search` with progress reports."""
+    def callback(done, total, best_aic, order, seasonal_order):
+        # The winning orders ride along so a timed-out search is still useful
+        return progress(done, total, best_aic, order=order, seasonal_order=seasonal_order)
+
+    return forecasting.grid_search(ts, exog=exog, candidates=candidates, callback=callback)
+
+
+def find_job(key):
+    """The job last started with ``key``, or None."""
+    with _shared_lock:
+        return _shared_jobs.get(key)
+
+
+def start_grid_search(ts, exog=None, candidates=None, time_budget=DEFAULT_TIME_BUDGET, key=None):
+    """Start a SARIMA(X) grid search in the background and return its FitJob.
+
+    With a ``key`` (e.g. built from the dataset hash), a search for the same
+    key that is running or done is returned instead of starting another one.
+    """
+    with _shared_lock:
+        job = _shared_jobs.get(key) if key is not None else None
+        if job is not None and job.poll().state in ("running", "done"):
+            return job
+        job = FitJob(grid_search_target, args=(ts,),
+                     kwargs={"exog": exog, "candidates": candidates},
+                     time_budget=time_budget).start()
+        if key is not None:
+            _shared_jobs[key] = job
+            _shared_jobs.move_to_end(key)
+            while len(_shared_jobs) > MAX_SHARED_JOBS:
+                _shared_jobs.popitem(last=False)
+    return job
@@ -0,0 +1,114 @@
+"""The notebook's KDD process as a cached pipeline.
+
+Stages: cleaning -> selection/transformation -> mining (KMeans, flood
+classifiers, time series) -> evaluation (cluster summaries, risk tables).
+Run with::
+
+    from floodcode.kdd import run_kdd
+    result = run_kdd(raw_df, cache_dir=".floodcode-cache", n_clusters=4)
+    result["cluster_summary"]
+
+Cached outputs are keyed by the source of the modules the stages call as
+well, so results computed by older code are not served after an upgrade.
+"""
+
+from floodcode import calibration, cleaning, dtypes, features, imputation, models, timeseries, training
+from floodcode.pipeline import Pipeline, source_hash
+
+DEFAULT_PARAMS = {"n_clusters": 3, "calibration": "isotonic"}
+
+kdd = Pipeline(version=source_hash(calibration, cleaning, dtypes, features, imputation, models, timeseries,
+                                   training))
+
+
+# ------------------ DATA CLEANING ------------------
+@kdd.node(inputs=["raw"])
+def cleaned(raw):
+    # Stored with the smallest safe dtypes, so every later stage works on the compact frame
+    return dtypes.optimize(cleaning.clean(raw))[0]
+
+
+# ------------------ SELECTION / TRANSFORMATION ------------------
+@kdd.node(inputs=["cleaned"])
+def design(cleaned):
+    # One-hot encoded once; the feature sets below are column subsets of it
+    return features.design_matrix(cleaned)
+
+
+@kdd.node(inputs=["cleaned", "design"])
+def encoded(cleaned, design):
+    return features.clustering_features(cleaned, matrix=design)
+
+
+@kdd.node(inputs=["cleaned", "design"])
+def occurrence_data(cleaned, design):
+    return features.occurrence_features(cleaned, matrix=design)
+
+
+@kdd.node(inputs=["cleaned", "design"])
+def refined_data(cleaned, design):
+    return features.occurrence_features(cleaned, with_location=True, matrix=design)
+
+
+@kdd.node(inputs=["cleaned", "design"])
+def severity_data(cleaned, design):
+    return features.severity_features(cleaned, matrix=design)
+
+
+@kdd.node(inputs=["cleaned"])
+def daily_water_level(cleaned):
+    return timeseries.daily_series(cleaned['Water Level'], timeseries.date_index(cleaned))
+
+
+# ------------------ DATA MINING ------------------
+@kdd.node(inputs=["encoded"], params=["n_clusters"])
+def clusters(encoded, n_clusters):
+    return models.cluster_events(encoded, n_clusters=n_clusters)
+
+
+@kdd.node(inputs=["occurrence_data"], params=["calibration"])
+def occurrence_model(occurrence_data, calibration):
+    # The monthly risk table reports calibrated probabilities
+    return models.train_classifier(*occurrence_data, calibrate=calibration)
+
+
+@kdd.node(inputs=["refined_data"])
+def refined_model(refined_data):
+    return models.train_classifier(*refined_data)
+
+
+@kdd.node(inputs=["severity_data"])
+def severity_model(severity_data):
+    X, y = severity_data
+    return models.train_classifier(X, y, stratify=y.value_counts().min() >= 2)
+
+
+# ------------------ PATTERN EVALUATION ------------------
+@kdd.node(inputs=["cleaned", "clusters"])
+def cluster_summary(cleaned, clusters):
+    return models.cluster_summary(cleaned, clusters)
+
+
+@kdd.node(inputs=["cleaned"])
+def monthly_flood_probability(cleaned):
+    return models.flood_probability(cleaned, 'Month')
+
+
+@kdd.node(inputs=["cleaned"])
+def municipal_flood_probability(cleaned):
+    return models.flood_probability(cleaned, 'Municipality')
+
+
+@kdd.node(inputs=["occurrence_model", "occurrence_data"])
+def monthly_predictions(occurrence_model, occurrence_data):
+    return models.monthly_flood_predictions(occurrence_model["model"], occurrence_data[0],
+                                            occurrence_model["calibrator"])
+
+
+EVALUATION_NODES = ["cluster_summary", "monthly_flood_probability", "municipal_flood_probability",
+                    "monthly_predictions", "refined_model", "severity_model"]
+
+
+def run_kdd(raw, cache_dir=None, targets=EVALUATION_NODES, **params):
+    """Run the KDD pipeline on a raw DataFrame; ``params`` override DEFAULT_PARAMS."""
+    return kdd.run(targets, sources={"raw": raw}, params={**DEFAULT_PARAMS, **params}, cache_dir=cache_dir)
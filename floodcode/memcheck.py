@@ -0,0 +1,81 @@
+"""Peak-memory checks of the preprocessing path.
+
+``tracemalloc`` sees NumPy and pandas allocations, so the peak it reports
+while cleaning and encoding a frame is a fair measure of the temporary
+copies made along the way::
+
+    python -m floodcode.memcheck data.csv
+
+Without file arguments it checks synthetic records of ``SYNTHETIC_ROWS`` rows.
+"""
+
+import sys
+import tracemalloc
+
+from floodcode import cleaning, dtypes, features, ingest, synthetic
+
+# Peak allocation allowed during preprocessing, as a multiple of the input frame's size
+MAX_PEAK_RATIO = 2.0
+
+# Fixed overhead allowed on top, so small files aren't failed by per-call bookkeeping
+SLACK_BYTES = 1024 * 1024
+
+SYNTHETIC_ROWS = 200_000
+
+
+def peak_memory(func, *args, **kwargs):
+    """Call ``func`` and return ``(result, peak bytes allocated during the call)``."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        result = func(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return result, peak
+
+
+def preprocess(raw):
+    """Cleaning, dtype compaction and the design matrix, as the app and pipeline run them."""
+    clean_df = dtypes.optimize(cleaning.clean(raw))[0]
+    return clean_df, features.design_matrix(clean_df)
+
+
+def check_preprocessing(raw, max_ratio=MAX_PEAK_RATIO):
+    """Run ``preprocess`` on ``raw`` and fail if its peak allocation exceeds ``max_ratio`` x the input.
+
+    Returns the measured ratio; raises RuntimeError when the peak is above
+    ``max_ratio`` x the input plus ``SLACK_BYTES``.
+    """
+    input_bytes = raw.memory_usage(index=True, deep=True).sum()
+    _, peak = peak_memory(preprocess, raw)
+    ratio = peak / input_bytes
+    if peak > max_ratio * input_bytes + SLACK_BYTES:
+        raise RuntimeError(f"preprocessing peaked at {peak / 1e6:.1f} MB, {ratio:.2f}x the "
+                           f"{input_bytes / 1e6:.1f} MB input (limit {max_ratio}x)")
+    return ratio
+
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    failed = False
+    for path in paths or [None]:
+        if path is None:
+            path, raw = f"synthetic ({SYNTHETIC_ROWS} rows)", synthetic.generate(SYNTHETIC_ROWS)
+        else:
+            with open(path, "rb") as f:
+                raw = ingest.read_table(f, path, columns=cleaning.ANALYSIS_COLS)
+        try:
+            print(f"{path}: peak {check_preprocessing(raw):.2f}x input")
+        except RuntimeError as e:
+            print(f"{path}: {e}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
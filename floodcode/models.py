@@ -0,0 +1,142 @@
+"""Flood classifiers, event clustering and flood risk tables.
+
+scikit-learn is imported inside the functions that use it.
+"""
+
+import pandas as pd
+
+from floodcode import training
+from floodcode.cleaning import NUMERIC_COLS
+from floodcode.features import flood_occurred
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.3
+
+# "forest" takes one-hot features; "boosting" takes native categoricals (``native=True`` features)
+MODEL_KINDS = ["forest", "boosting"]
+
+
+def make_classifier(kind="forest", random_state=RANDOM_STATE):
+    """Unfitted RandomForestClassifier ("forest") or HistGradientBoostingClassifier ("boosting")."""
+    if kind == "forest":
+        from sklearn.ensemble import RandomForestClassifier
+
+        return RandomForestClassifier(random_state=random_state)
+    if kind == "boosting":
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        # Categorical columns are split on natively, from their pandas dtype
+        return HistGradientBoostingClassifier(categorical_features="from_dtype", random_state=random_state)
+    raise ValueError(f"unknown model kind {kind!r}; expected one of {MODEL_KINDS}")
+
+
+def train_classifier(X, y, stratify=False, test_size=TEST_SIZE, random_state=RANDOM_STATE, tune=False,
+                     kind="forest", calibrate=None):
+    """Fit a classifier (see :func:`make_classifier`) on a train split and score it on the rest.
+
+    Returns a dict with the fitted ``model``, its test ``accuracy``, the text
+    classification ``report`` and the test split (``X_test``, ``y_test``,
+    ``y_pred``). With ``tune=True`` the forest's hyperparameters are chosen
+    on the train split by :func:`floodcode.tuning.tune_forest` (pass a dict
+    of its options instead of True to change them), and the dict also holds
+    the ``tuning`` result. With ``calibrate="isotonic"`` or ``"sigmoid"`` a
+    :class:`floodcode.calibration.Calibrator` is fit on out-of-fold
+    predictions of the train split; it is returned as ``calibrator`` (else
+    None) with the test ``brier`` score of the raw and calibrated probabilities.
+    """
+    from sklearn.metrics import accuracy_score, classification_report
+    from sklearn.model_selection import train_test_split
+
+    if tune and kind != "forest":
+        raise ValueError("tuning is only available for the random forest")
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state,
+                                                        stratify=y if stratify else None)
+    tuning = None
+    if tune:
+        from floodcode.tuning import tune_forest
+
+        tuning = tune_forest(X_train, y_train, random_state=random_state, **(tune if isinstance(tune, dict) else {}))
+        model = tuning.model
+    else:
+        model = training.fit(make_classifier(kind, random_state), X_train, y_train)
+    y_pred = training.predict(model, X_test)
+
+    calibrator, brier = None, None
+    if calibrate:
+        from floodcode.calibration import brier_score, fit_calibrator
+
+        calibrator = fit_calibrator(model, X_train, y_train, method=calibrate, random_state=random_state)
+        raw = training.predict_proba(model, X_test)
+        brier = {"raw": brier_score(raw, y_test, model.classes_),
+                 "calibrated": brier_score(calibrator.apply(raw), y_test, model.classes_)}
+    return {
+        "model": model,
+        "accuracy": accuracy_score(y_test, y_pred),
+        "report": classification_report(y_test, y_pred, zero_division=0),
+        "X_test": X_test,
+        "y_test": y_test,
+        "y_pred": y_pred,
+        "tuning": tuning,
+        "calibrator": calibrator,
+        "brier": brier,
+    }
+
+
+def _flood_probabilities(model, X, calibrator):
+    probabilities = training.predict_proba(model, X)
+    if calibrator is not None:
+        probabilities = calibrator.apply(probabilities)
+    return probabilities[:, list(model.classes_).index(1)]
+
+
+def monthly_flood_predictions(model, X, calibrator=None):
+    """Predicted flood probability per month, other features held at their median.
+
+    ``X`` is the occurrence feature matrix the model was trained on, with
+    month dummies or a categorical 'Month' column. With a ``calibrator``
+    the calibrated probabilities are returned.
+    """
+    if isinstance(X.get('Month', pd.Series(dtype=float)).dtype, pd.CategoricalDtype):
+        months = list(X['Month'].cat.categories)
+        # Every other column at its median, or its most frequent category
+        typical = {col: X[col].mode().iloc[0] if isinstance(X[col].dtype, pd.CategoricalDtype) else X[col].median()
+                   for col in X.columns if col != 'Month'}
+        prediction_df = pd.DataFrame({col: [value] * len(months) for col, value in typical.items()})
+        prediction_df['Month'] = months
+        prediction_df = prediction_df.astype({col: X[col].dtype for col in X.columns})[X.columns]
+        probabilities = _flood_probabilities(model, prediction_df, calibrator)
+        return pd.Series(probabilities, index=months, name='flood_probability').sort_values(ascending=False)
+
+    month_columns = [col for col in X.columns if col.startswith('Month_')]
+    other_columns = [col for col in X.columns if col not in month_columns]
+    medians = X[other_columns].median()
+
+    prediction_df = pd.DataFrame(False, index=range(len(month_columns)), columns=X.columns)
+    for row, col in enumerate(month_columns):
+        prediction_df.loc[row, col] = True
+    for col in other_columns:
+        prediction_df[col] = medians[col]
+
+    probabilities = _flood_probabilities(model, prediction_df[X.columns], calibrator)
+    months = [col[len('Month_'):] for col in month_columns]
+    return pd.Series(probabilities, index=months, name='flood_probability').sort_values(ascending=False)
+
+
+def flood_probability(df, by):
+    """Share of records with a flood for each value of ``by``, highest first."""
+    keys = df[by].fillna('Unknown') if by == 'Month' else df[by]
+    return flood_occurred(df).groupby(keys).mean().sort_values(ascending=False)
+
+
+def cluster_events(encoded, n_clusters=3, random_state=RANDOM_STATE):
+    """KMeans cluster label of every flood event."""
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
+    return pd.Series(kmeans.fit_predict(encoded), index=encoded.index, name='Cluster')
+
+
+def cluster_summary(df, clusters):
+    """Count, mean, median and std of the numeric columns per cluster."""
+    return df[NUMERIC_COLS].groupby(clusters).agg(['count', 'mean', 'median', 'std'])
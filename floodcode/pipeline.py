@@ -0,0 +1,206 @@
+"""Small DAG runner with content-hashed, on-disk caching of node outputs.
+
+Each node is a function with declared inputs (other nodes, sources or
+parameters). A node's cache key is built from its code, the content hashes of
+its inputs and the values of its parameters, so changing a parameter only
+re-executes the nodes downstream of it, and an upstream node that reruns but
+produces identical output does not invalidate anything below it. A node's
+own source does not cover the helpers it calls, so the pipeline's
+``version`` (e.g. ``source_hash`` of the modules the nodes call) is part of
+every key, and editing those modules invalidates the cache as well.
+
+    pipeline = Pipeline(cache_dir=".floodcode-cache", version=source_hash(cleaning))
+
+    @pipeline.node(inputs=["raw"])
+    def cleaned(raw):
+        ...
+
+    result = pipeline.run(["cleaned"], sources={"raw": df})
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from floodcode.instrument import stage
+
+
+def content_hash(obj):
+    """Stable hash of a node output or source value."""
+    digest = hashlib.sha1()
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        if isinstance(obj, pd.DataFrame):
+            layout = (list(obj.columns), [str(dtype) for dtype in obj.dtypes])
+        else:
+            layout = (obj.name, str(obj.dtype))
+        digest.update(repr((type(obj).__name__, layout)).encode())
+    elif isinstance(obj, (tuple, list)):
+        for item in obj:
+            digest.update(content_hash(item).encode())
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=repr):
+            digest.update(repr(key).encode())
+            digest.update(content_hash(obj[key]).encode())
+    else:
+        digest.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def source_hash(*modules):
+    """Hash of the source of ``modules``, to version a pipeline by the code its nodes call."""
+    digest = hashlib.sha1()
+    for module in modules:
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            source = module.__name__
+        digest.update(source.encode())
+    return digest.hexdigest()
+
+
+def _code_hash(func):
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = f"{func.__module__}.{func.__qualname__}"
+    return hashlib.sha1(source.encode()).hexdigest()
+
+
+@dataclass
+class Node:
+    name: str
+    func: object
+    inputs: list
+    params: list
+
+    @property
+    def code_hash(self):
+        return _code_hash(self.func)
+
+
+@dataclass
+class PipelineResult:
+    outputs: dict
+    executed: list = field(default_factory=list)
+    cached: list = field(default_factory=list)
+
+    def __getitem__(self, name):
+        return self.outputs[name]
+
+
+class Pipeline:
+    """Registry of nodes plus an optional on-disk cache directory and code version."""
+
+    def __init__(self, cache_dir=None, version=None):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.nodes = {}
+
+    def node(self, name=None, inputs=(), params=()):
+        """Register a function as a node.
+
+        ``inputs`` are node or source names passed positionally; ``params``
+        are parameter names passed as keyword arguments.
+        """
+        def decorator(func):
+            node_name = name or func.__name__
+            self.nodes[node_name] = Node(node_name, func, list(inputs), list(params))
+            return func
+        return decorator
+
+    def _order(self, targets, sources):
+        """Nodes needed for ``targets`` in dependency order."""
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done or name in sources:
+                return
+            if name not in self.nodes:
+                raise KeyError(f"Unknown node or source {name!r}")
+            if name in visiting:
+                raise ValueError(f"Cycle through node {name!r}")
+            visiting.add(name)
+            for upstream in self.nodes[name].inputs:
+                visit(upstream)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    @staticmethod
+    def _path(cache_dir, name, key):
+        return os.path.join(cache_dir, name, f"{key}.pkl")
+
+    def _load(self, cache_dir, name, key):
+        if cache_dir is None:
+            return None
+        try:
+            with open(self._path(cache_dir, name, key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _store(self, cache_dir, name, key, entry):
+        if cache_dir is None:
+            return
+        directory = os.path.join(cache_dir, name)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file and rename so readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(cache_dir, name, key))
+
+    def run(self, targets, sources=None, params=None, cache_dir=None):
+        """Compute ``targets`` and return a PipelineResult.
+
+        ``sources`` maps source names to values (e.g. the raw DataFrame);
+        ``params`` maps parameter names to values. ``cache_dir`` overrides
+        the pipeline's directory for this run only, so concurrent runs can
+        use different ones. Every computed node, not only the targets, is
+        included in the outputs.
+        """
+        cache_dir = cache_dir or self.cache_dir
+        sources = sources or {}
+        params = params or {}
+        outputs = dict(sources)
+        hashes = {name: content_hash(value) for name, value in sources.items()}
+        result = PipelineResult(outputs=outputs)
+
+        for name in self._order(targets, sources):
+            node = self.nodes[name]
+            missing = [param for param in node.params if param not in params]
+            if missing:
+                raise KeyError(f"Node {name!r} needs parameters {missing}")
+            node_params = {param: params[param] for param in node.params}
+
+            key = hashlib.sha1(repr((
+                name,
+                self.version,
+                node.code_hash,
+                [hashes[upstream] for upstream in node.inputs],
+                sorted((param, repr(value)) for param, value in node_params.items()),
+            )).encode()).hexdigest()
+
+            entry = self._load(cache_dir, name, key)
+            if entry is None:
+                with stage(name) as handle:
+                    output = node.func(*(outputs[upstream] for upstream in node.inputs), **node_params)
+                    handle.rows = getattr(output, "shape", (None,))[0]
+                entry = (output, content_hash(output))
+                self._store(cache_dir, name, key, entry)
+                result.executed.append(name)
+            else:
+                result.cached.append(name)
+            outputs[name], hashes[name] = entry
+
+        return result
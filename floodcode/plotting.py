@@ -0,0 +1,143 @@
+"""Interactive water-level charts for the Streamlit app.
+
+Long daily histories are cut to the visible date range and reduced with
+Largest-Triangle-Three-Buckets (LTTB) downsampling before they reach the
+browser, then drawn with Plotly's WebGL ``Scattergl`` traces. Changing the
+visible range re-queries the full-resolution data, so zooming in shows
+every point again.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Points per trace sent to the browser
+DEFAULT_MAX_POINTS = 2000
+
+
+def lttb(x, y, threshold):
+    """Indices of the ``threshold`` points LTTB keeps from ``(x, y)``.
+
+    The first and last points are always kept. Between them, each bucket
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket, which preserves peaks
+    such as flood crests.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        if end >= next_end:
+            end, next_end = min(end, n - 1), n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(series, start=None, end=None, max_points=DEFAULT_MAX_POINTS):
+    """``series`` cut to ``[start, end]`` and LTTB-reduced to ``max_points``."""
+    visible = series.loc[start:end].dropna()
+    if len(visible) <= max_points:
+        return visible
+    x = visible.index.asi8.astype(float) if isinstance(visible.index, pd.DatetimeIndex) \
+        else visible.index.to_numpy(dtype=float)
+    return visible.iloc[lttb(x, visible.to_numpy(dtype=float), max_points)]
+
+
+def timeseries_figure(traces, start=None, end=None, max_points=DEFAULT_MAX_POINTS,
+                      title="Daily Average Water Level Over Time", yaxis_title="Average Water Level"):
+    """Plotly figure with one WebGL line per entry of ``traces`` (name -> Series).
+
+    Each trace is downsampled over the visible range ``[start, end]``.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for name, series in traces.items():
+        if series is None:
+            continue
+        visible = downsample(series, start, end, max_points)
+        fig.add_trace(go.Scattergl(x=visible.index, y=visible.to_numpy(), mode="lines", name=name))
+    fig.update_layout(title=title, xaxis_title="Date", yaxis_title=yaxis_title,
+                      hovermode="x unified", margin=dict(l=40, r=20, t=50, b=40))
+    return fig
+
+
+# Static charts drawn onto a matplotlib Figure; render them through
+# floodcode.figcache.cached_figure so unchanged charts are not redrawn.
+
+def bar_chart(fig, series, title="", xlabel="", ylabel=""):
+    """Bar chart of ``series`` (e.g. the sorted flood probabilities)."""
+    ax = fig.subplots()
+    series.plot(kind='bar', color='skyblue', ax=ax)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    fig.tight_layout()
+
+
+def histogram(fig, series, bins=20, title="", xlabel="", ylabel="Frequency"):
+    """Histogram of ``series``."""
+    ax = fig.subplots()
+    ax.hist(series.dropna(), bins=bins, edgecolor='black')
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+
+
+def forecast_chart(fig, history, fitted=None, forecast=None, title="Model Fit and Forecast",
+                   ylabel="Average Water Level"):
+    """History with fitted values and future forecast, as in the notebook."""
+    ax = fig.subplots()
+    ax.plot(history.index, history, label='Historical Data')
+    if fitted is not None:
+        ax.plot(fitted.index, fitted, color='green', label='Fitted Values')
+    if forecast is not None:
+        ax.plot(forecast.index, forecast, color='red', label='Future Forecast')
+    ax.set_title(title)
+    ax.set_xlabel('Date')
+    ax.set_ylabel(ylabel)
+    ax.legend()
+
+
+def residual_diagnostics(fig, resid, lags=10, title="Model Diagnostics"):
+    """The four panels of ``plot_diagnostics`` drawn from the model residuals."""
+    from statsmodels.graphics.gofplots import qqplot
+    from statsmodels.graphics.tsaplots import plot_acf
+
+    resid = resid.dropna()
+    standardized = (resid - resid.mean()) / resid.std()
+    (ax_resid, ax_hist), (ax_qq, ax_acf) = fig.subplots(2, 2)
+
+    ax_resid.plot(standardized.index, standardized)
+    ax_resid.axhline(0, color='black', linewidth=0.8)
+    ax_resid.set_title('Standardized residual')
+
+    ax_hist.hist(standardized, bins=30, density=True, label='Hist')
+    grid = np.linspace(standardized.min(), standardized.max(), 200)
+    ax_hist.plot(grid, np.exp(-grid ** 2 / 2) / np.sqrt(2 * np.pi), color='orange', label='N(0,1)')
+    ax_hist.set_title('Histogram')
+    ax_hist.legend()
+
+    qqplot(standardized.to_numpy(), line='s', ax=ax_qq)
+    ax_qq.set_title('Normal Q-Q')
+
+    plot_acf(standardized, lags=lags, ax=ax_acf)
+    ax_acf.set_title('Correlogram')
+
+    fig.suptitle(title)
+    fig.tight_layout()
@@ -0,0 +1,158 @@
+"""Column profiles of an uploaded dataset.
+
+``profile_frame`` computes, per column, the null count, cardinality, top
+values and (for numeric columns) moments and quartiles. Each column is
+scanned once: a single ``value_counts`` gives both the cardinality and the
+top values, and numeric statistics come from one NumPy array.
+
+Columns sketched while the upload was read (see :mod:`floodcode.sketches`)
+take their cardinality and top values from the sketch instead of counting
+them again; the counts cover the whole upload even in a sampled profile.
+
+For large frames ``Profiler.get`` first returns a profile of a random sample
+for a fast first paint while the exact profile is computed in a background
+thread; exact profiles are cached per dataset hash.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from floodcode.figcache import data_key
+
+# Rows profiled for the approximate first paint
+SAMPLE_ROWS = 10_000
+
+# Most frequent values listed per column
+TOP_K = 5
+
+# Exact profiles kept before the least recently used ones are dropped
+MAX_PROFILES = 16
+
+RANDOM_STATE = 42
+
+
+def column_profile(values, top_k=TOP_K, scale=1.0, sketch=None):
+    """Profile of one column; counts are multiplied by ``scale``.
+
+    With a ``sketch`` of the whole column, ``unique`` and ``top`` are its
+    estimates rather than counts of ``values``.
+    """
+    nulls = values.isna().to_numpy()
+    present = values[~nulls]
+    if sketch is not None:
+        unique, top, top_scale = sketch.cardinality(), sketch.top(top_k), 1.0
+    else:
+        counts = present.value_counts(sort=True)
+        unique, top, top_scale = len(counts), counts.head(top_k), scale
+
+    row = {
+        "dtype": str(values.dtype),
+        "count": round(len(present) * scale),
+        "nulls": round(int(nulls.sum()) * scale),
+        "null_pct": 100 * nulls.mean() if len(nulls) else 0.0,
+        "unique": unique,
+        "top": ", ".join(f"{value} ({round(count * top_scale)})" for value, count in top.items()),
+    }
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numbers = present.to_numpy(dtype=float)
+        if numbers.size:
+            q1, median, q3 = np.quantile(numbers, [0.25, 0.5, 0.75])
+            row.update({
+                "mean": numbers.mean(),
+                "std": numbers.std(ddof=1) if numbers.size > 1 else np.nan,
+                "min": numbers.min(),
+                "25%": q1,
+                "50%": median,
+                "75%": q3,
+                "max": numbers.max(),
+            })
+    return row
+
+
+def profile_frame(df, sample_rows=None, top_k=TOP_K, random_state=RANDOM_STATE, sketches=None):
+    """One row of statistics per column of ``df``.
+
+    With ``sample_rows`` set and a longer frame, a random sample of that many
+    rows is profiled and counts are scaled to the full length; ``unique`` is
+    then the number of distinct values in the sample, a lower bound, except
+    for the columns in ``sketches`` (column name to ``ColumnSketch``).
+    """
+    sketches = sketches or {}
+    scale = 1.0
+    if sample_rows is not None and len(df) > sample_rows:
+        scale = len(df) / sample_rows
+        df = df.sample(sample_rows, random_state=random_state)
+    profile = pd.DataFrame([column_profile(df[col], top_k=top_k, scale=scale, sketch=sketches.get(col))
+                            for col in df.columns], index=df.columns)
+    profile.attrs["approximate"] = scale != 1.0
+    profile.attrs["sketched"] = [col for col in df.columns if col in sketches]
+    return profile
+
+
+class Profiler:
+    """Sampled-then-exact profiles, with exact ones cached per dataset hash."""
+
+    def __init__(self, sample_rows=SAMPLE_ROWS, max_profiles=MAX_PROFILES):
+        self.sample_rows = sample_rows
+        self.max_profiles = max_profiles
+        self._exact = OrderedDict()
+        self._sampled = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profiler")
+
+    def _store(self, key, profile):
+        with self._lock:
+            self._exact[key] = profile
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_profiles:
+                self._exact.popitem(last=False)
+            self._pending.pop(key, None)
+            self._sampled.pop(key, None)
+
+    def get(self, df, key=None, sketches=None):
+        """Return ``(profile, exact)`` for ``df``.
+
+        ``key`` identifies the dataset (e.g. a hash of the uploaded bytes);
+        by default it is a content hash of ``df``. ``sketches`` are the
+        column sketches built while ``df`` was read. Small frames are profiled
+        exactly right away. For larger ones the sampled profile is returned
+        with ``exact=False`` until the background computation finishes.
+        """
+        key = key or data_key(df)
+        with self._lock:
+            if key in self._exact:
+                self._exact.move_to_end(key)
+                return self._exact[key], True
+            future = self._pending.get(key)
+
+        if len(df) <= self.sample_rows:
+            profile = profile_frame(df, sketches=sketches)
+            self._store(key, profile)
+            return profile, True
+
+        if future is None:
+            future = self._executor.submit(profile_frame, df, sketches=sketches)
+            with self._lock:
+                self._pending[key] = future
+            future.add_done_callback(lambda f: f.exception() is None and self._store(key, f.result()))
+        elif future.done():
+            # Raises if the exact profile failed, instead of showing the sample forever
+            return future.result(), True
+
+        with self._lock:
+            sampled = self._sampled.get(key)
+        if sampled is None:
+            sampled = profile_frame(df, sample_rows=self.sample_rows, sketches=sketches)
+            with self._lock:
+                # Only the datasets still being refined keep a sampled profile
+                if key not in self._exact:
+                    self._sampled[key] = sampled
+        return sampled, False
+
+
+profiler = Profiler()
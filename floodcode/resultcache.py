@@ -0,0 +1,188 @@
+"""Cache of analysis results shared by all Streamlit sessions.
+
+Several people often upload the same weekly file. Results computed from it
+(cleaned frames, risk tables, fitted models, forecasts) are stored under a
+key built from the dataset's hash, so the first session computes them and
+every other session reuses them::
+
+    cleaned = result_cache.get_or_compute(("cleaned", dataset_key), lambda: clean(df))
+
+Requests for a key that is being computed wait for that computation instead
+of starting their own (single flight). With a ``cache_dir`` (or the
+FLOODCODE_RESULT_CACHE_DIR environment variable) results are also pickled to
+disk, so other server processes and restarts reuse them; a lock file per key
+keeps processes from computing the same result at once. The directory is not
+invalidated when the code changes; clear it after an upgrade.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process single flight
+    fcntl = None
+
+# Results kept in memory before the least recently used are dropped
+MAX_ENTRIES = 32
+
+_MISSING = object()
+
+
+def key_digest(key):
+    """File-safe digest of a cache key (a tuple of strings and numbers)."""
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+@contextmanager
+def _file_lock(path):
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class ResultCache:
+    """Thread-safe LRU of results with single-flight computation and an optional disk tier."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True
+        return self.cache_dir is not None and os.path.exists(self._path(key))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key_digest(key)}.pkl")
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return _MISSING
+        try:
+            with open(self._path(key), "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+        self.disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    def _store(self, key, value):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, key, default=None):
+        """The stored result for ``key`` (from memory, else disk), or ``default``."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        value = self._load(key)
+        return default if value is _MISSING else value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.cache_dir is not None:
+            self._store(key, value)
+
+    def get_or_compute(self, key, compute):
+        """The result for ``key``, calling ``compute()`` only if no one has it or is computing it.
+
+        Results are shared, not copied: callers must not modify them.
+        """
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            value = self._compute(key, compute)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _compute(self, key, compute):
+        value = self._load(key)
+        if value is not _MISSING:
+            return value
+        if self.cache_dir is None:
+            self.misses += 1
+            value = compute()
+            self._remember(key, value)
+            return value
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with _file_lock(self._path(key) + ".lock"):
+            # Another process may have stored it while we waited for the lock
+            value = self._load(key)
+            if value is _MISSING:
+                self.misses += 1
+                value = compute()
+                self.put(key, value)
+        return value
+
+    def clear(self, disk=False):
+        """Drop the in-memory results, and the stored files too with ``disk=True``."""
+        with self._lock:
+            self._entries.clear()
+        if disk and self.cache_dir is not None and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pkl"):
+                    os.unlink(os.path.join(self.cache_dir, name))
+
+
+# Process-wide cache used by the app
+result_cache = ResultCache(cache_dir=os.environ.get("FLOODCODE_RESULT_CACHE_DIR") or None)
@@ -0,0 +1,196 @@
+"""Mergeable sketches of categorical columns.
+
+Each categorical column gets a HyperLogLog (distinct count) and a Count-Min
+sketch with a small set of heavy-hitter candidates (top values). Sketches are
+updated one chunk at a time while a file is read and can be merged across
+chunks or files, so cardinalities and top municipalities/barangays over a
+whole batch come without holding every value in memory::
+
+    df, sketches = read_with_sketches(file, name)
+    sketches['Barangay'].cardinality(), sketches['Barangay'].top(5)
+"""
+
+import numpy as np
+import pandas as pd
+
+from floodcode import ingest
+
+# HyperLogLog registers are 2**HLL_PRECISION bytes; standard error ~1.04 / sqrt(2**p)
+HLL_PRECISION = 12
+
+# Count-Min counters per row and number of rows (independent hashes)
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+
+# Heavy-hitter candidates tracked per column for top-k queries
+TOP_CANDIDATES = 64
+
+
+def _hash(values, seed=0):
+    """64-bit hashes of ``values``; ``seed`` selects an independent hash."""
+    return pd.util.hash_array(np.asarray(values, dtype=object), hash_key=f"floodcode{seed:07d}")
+
+
+def _bit_length(x):
+    """Vectorised ``int.bit_length`` for uint64 arrays."""
+    high = (x >> np.uint64(32)).astype(np.float64)
+    low = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp's exponent is the bit length for positive values; exact below 2**53
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class HyperLogLog:
+    """Distinct-count estimator; merging takes the register-wise maximum."""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values):
+        hashes = _hash(values)
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        # Position of the first 1-bit in the remaining 64 - p bits
+        rank = (64 - self.precision + 1 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return float(estimate)
+
+
+class CountMinSketch:
+    """Frequency estimates that never undercount; merging adds the tables."""
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, values):
+        width = np.uint64(self.table.shape[1])
+        return [(_hash(values, seed=row) % width).astype(np.intp) for row in range(self.table.shape[0])]
+
+    def add(self, values, counts=None):
+        for row, columns in enumerate(self._columns(values)):
+            self.table[row] += np.bincount(columns, weights=counts, minlength=self.table.shape[1]).astype(np.int64)
+        return self
+
+    def merge(self, other):
+        self.table += other.table
+        return self
+
+    def estimate(self, values):
+        if not len(values):
+            return np.zeros(0, dtype=np.int64)
+        return np.min([self.table[row, columns] for row, columns in enumerate(self._columns(values))], axis=0)
+
+
+class ColumnSketch:
+    """HyperLogLog, Count-Min sketch and heavy-hitter candidates of one column."""
+
+    def __init__(self, capacity=TOP_CANDIDATES):
+        self.capacity = capacity
+        self.hll = HyperLogLog()
+        self.cms = CountMinSketch()
+        self.candidates = []
+        self.count = 0
+        self.nulls = 0
+
+    def _prune(self, candidates):
+        if len(candidates) > self.capacity:
+            estimates = self.cms.estimate(candidates)
+            keep = np.argsort(-estimates, kind="stable")[:self.capacity]
+            candidates = [candidates[i] for i in keep]
+        return candidates
+
+    def update(self, values):
+        values = pd.Series(values)
+        present = values.dropna()
+        self.count += len(present)
+        self.nulls += len(values) - len(present)
+        if present.empty:
+            return self
+        counts = present.value_counts(sort=True)
+        self.hll.add(counts.index)
+        self.cms.add(counts.index, counts.to_numpy(dtype=float))
+        # A value can only be frequent overall if it is frequent in some chunk
+        known = set(self.candidates)
+        new = [value for value in counts.index[:self.capacity] if value not in known]
+        self.candidates = self._prune(self.candidates + new)
+        return self
+
+    def merge(self, other):
+        self.hll.merge(other.hll)
+        self.cms.merge(other.cms)
+        self.count += other.count
+        self.nulls += other.nulls
+        known = set(self.candidates)
+        self.candidates = self._prune(self.candidates + [value for value in other.candidates
+                                                         if value not in known])
+        return self
+
+    def cardinality(self):
+        return round(self.hll.estimate())
+
+    def top(self, k=5):
+        """The ``k`` most frequent values and their estimated counts."""
+        estimates = pd.Series(self.cms.estimate(self.candidates), index=pd.Index(self.candidates, dtype=object),
+                              dtype="int64")
+        return estimates.sort_values(ascending=False, kind="stable").head(k)
+
+
+def categorical_columns(df):
+    return list(df.select_dtypes(include=['object', 'string', 'category']).columns)
+
+
+def update_sketches(sketches, df, columns=None):
+    """Add the rows of ``df`` to ``sketches`` (a dict of column name to ColumnSketch)."""
+    for col in categorical_columns(df) if columns is None else columns:
+        if col in df.columns:
+            sketches.setdefault(col, ColumnSketch()).update(df[col])
+    return sketches
+
+
+def merge_sketches(*sketch_dicts):
+    """Merge per-column sketch dicts (e.g. one per file) into a new dict."""
+    merged = {}
+    for sketches in sketch_dicts:
+        for col, sketch in sketches.items():
+            if col in merged:
+                merged[col].merge(sketch)
+            else:
+                merged[col] = ColumnSketch(sketch.capacity).merge(sketch)
+    return merged
+
+
+def summarize(sketches, k=5):
+    """JSON-friendly cardinality and top values per column."""
+    return {col: {"count": sketch.count, "nulls": sketch.nulls, "cardinality": sketch.cardinality(),
+                  "top": {str(value): int(count) for value, count in sketch.top(k).items()}}
+            for col, sketch in sketches.items()}
+
+
+def read_with_sketches(file, name, columns=None, sketch_columns=None, sheet=None):
+    """Read a file like ``ingest.read_table`` and sketch it while the chunks stream in.
+
+    Returns ``(df, sketches)``; ``sketch_columns`` defaults to the categorical
+    columns of each chunk.
+    """
+    sketches = {}
+    chunks = []
+    for chunk in ingest.iter_chunks(file, name, columns=columns, sheet=sheet):
+        update_sketches(sketches, chunk, sketch_columns)
+        chunks.append(chunk)
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+    return df, sketches
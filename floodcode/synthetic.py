@@ -0,0 +1,87 @@
+"""Synthetic MDRRMO-style flood records for benchmarks and memory checks.
+
+The generated frame has the raw columns and the same kinds of dirt as the
+real spreadsheets: water levels written as '12 ft.'/'3ft' or text, damage
+amounts with thousands separators (including '422.510.5'), and missing
+dates, families and damage entries. Rows are in chronological order.
+"""
+
+import numpy as np
+import pandas as pd
+
+from floodcode.timeseries import MONTH_MAP
+
+MONTHS = [month for month in MONTH_MAP if month != 'Unknown']
+
+FLOOD_CAUSES = ['LPA', 'Easterlies and Shearline', 'Tropical Depression AURING', 'Southwest Monsoon',
+                'Intertropical Convergence Zone']
+
+# Share of entries left missing or written in one of the dirty formats
+MISSING_RATE = 0.1
+DIRTY_RATE = 0.3
+
+
+def generate(rows=10_000, municipalities=5, barangays=50, start_year=2018, years=4,
+             missing_rate=MISSING_RATE, dirty_rate=DIRTY_RATE, seed=0):
+    """Raw flood records with ``rows`` rows.
+
+    ``barangays`` are spread evenly over the ``municipalities``; every
+    barangay belongs to exactly one municipality, as in the real data.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Chronological dates over the requested years
+    start = pd.Timestamp(year=start_year, month=1, day=1)
+    days = (pd.Timestamp(year=start_year + years, month=1, day=1) - start).days
+    dates = start + pd.to_timedelta(np.sort(rng.integers(0, days, rows)), unit="D")
+
+    barangay_ids = rng.integers(0, barangays, rows)
+    municipality_ids = barangay_ids % municipalities
+    municipality_names = np.array([f"Municipality {i + 1}" for i in range(municipalities)], dtype=object)
+    barangay_names = np.array([f"Barangay {i + 1}" for i in range(barangays)], dtype=object)
+
+    # Wetter months and some municipalities flood more, so the models have something to learn
+    wet = np.isin(dates.month, [6, 7, 8, 9, 10, 11, 12])
+    level = rng.gamma(2.0, 3.0, rows) * (1 + wet) * (1 + 0.2 * municipality_ids / max(municipalities - 1, 1))
+    level = np.where(rng.random(rows) < 0.15, 0.0, np.round(level))
+
+    numbers = level.astype(int).astype(str).astype(object)
+    water_level = numbers.copy()
+    style = rng.random(rows)
+    with_unit = style < dirty_rate / 2
+    water_level[with_unit] = numbers[with_unit] + " ft."
+    without_space = (style >= dirty_rate / 2) & (style < dirty_rate)
+    water_level[without_space] = numbers[without_space] + "ft"
+    water_level[rng.random(rows) < 0.02] = "abc"
+
+    families = np.round(level * rng.uniform(1, 20, rows))
+    infrastructure = np.round(level * rng.uniform(0, 5000, rows), -2)
+    agriculture = np.round(level * rng.uniform(0, 8000, rows), -2)
+
+    df = pd.DataFrame({
+        'Year': dates.year.astype(float),
+        'Month': np.array(MONTHS, dtype=object)[dates.month - 1],
+        'Day': dates.day.astype(float),
+        'Municipality': municipality_names[municipality_ids],
+        'Barangay': barangay_names[barangay_ids],
+        'Flood Cause': np.array(FLOOD_CAUSES, dtype=object)[rng.integers(0, len(FLOOD_CAUSES), rows)],
+        'Water Level': water_level,
+        'No. of Families affected': families,
+        'Damage Infrastructure': _with_separators(infrastructure, rng, dirty_rate),
+        'Damage Agriculture': _with_separators(agriculture, rng, dirty_rate),
+    })
+
+    for col in ['Year', 'Month', 'Day', 'Water Level', 'No. of Families affected',
+                'Damage Infrastructure', 'Damage Agriculture']:
+        df.loc[rng.random(rows) < missing_rate, col] = np.nan
+    if rows:
+        df.loc[rng.integers(0, rows), 'Damage Agriculture'] = '422.510.5'
+    return df
+
+
+def _with_separators(amounts, rng, dirty_rate):
+    """Amounts as text, some written with thousands separators."""
+    text = amounts.astype(np.int64).astype(str).astype(object)
+    dirty = rng.random(len(amounts)) < dirty_rate
+    text[dirty] = [f"{amount:,}" for amount in amounts[dirty].astype(np.int64)]
+    return text
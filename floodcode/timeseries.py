@@ -0,0 +1,36 @@
+"""Daily time series built from the flood records."""
+
+import pandas as pd
+
+MONTH_MAP = {'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4, 'MAY': 5, 'JUNE': 6,
+             'JULY': 7, 'AUGUST': 8, 'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12,
+             'Unknown': 1}  # Unknown months are put in January, as in the notebook
+
+EXOG_COLS = ['No. of Families affected', 'Damage Infrastructure', 'Damage Agriculture']
+
+
+def date_index(df):
+    """Combine 'Year', 'Month' and 'Day' into a DatetimeIndex.
+
+    Missing parts are back- then forward-filled; impossible dates become NaT.
+    """
+    parts = pd.DataFrame({
+        'year': pd.to_numeric(df['Year'], errors='coerce').bfill().ffill(),
+        'month': df['Month'].bfill().ffill().map(MONTH_MAP),
+        'day': pd.to_numeric(df['Day'], errors='coerce').bfill().ffill(),
+    })
+    return pd.DatetimeIndex(pd.to_datetime(parts, errors='coerce'), name='Date')
+
+
+def daily_series(values, index):
+    """Daily mean of ``values`` over ``index`` with gaps forward/back-filled."""
+    series = pd.Series(values.to_numpy(), index=index, name=values.name)
+    series = series[series.index.notna()].sort_index()
+    return series.resample('D').mean().ffill().bfill()
+
+
+def daily_exog(df, index, columns=EXOG_COLS):
+    """Daily exogenous variables for SARIMAX, aligned like :func:`daily_series`."""
+    exog = df[columns].set_axis(index)
+    exog = exog[exog.index.notna()].sort_index()
+    return exog.resample('D').mean().ffill().bfill()
@@ -0,0 +1,214 @@
+"""Train the forecasting model families side by side and rank them.
+
+Every family runs in its own worker process, so the tournament takes about as
+long as its slowest member. A family that runs past its time budget is
+terminated and reported as ``"timeout"`` instead of holding up the others.
+
+Adding a family is a matter of decorating a module-level function with
+``@register_family("Name")``. The function receives ``(ts, exog, steps,
+candidates)`` and returns a dict with ``fitted`` and ``forecast`` series plus
+optional ``aic``, ``params`` and the fitted ``model``. ``candidates`` are the
+SARIMA (order, seasonal_order) pairs to search, e.g. the small grid suggested
+by :func:`floodcode.diagnostics.candidate_grid`; ``None`` searches the full
+:func:`floodcode.forecasting.sarima_grid`, which rarely fits a short budget::
+
+    candidates = diagnostics.candidate_grid(diagnostics.diagnose({"level": ts}).iloc[0])
+    tournament = run_tournament(ts, exog=exog, candidates=candidates)
+"""
+
+import multiprocessing
+import time
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait
+
+import pandas as pd
+
+from floodcode import forecasting
+
+# Seconds each family may run before it is killed
+DEFAULT_TIME_BUDGET = 300.0
+
+FAMILIES = {}
+
+
+def register_family(name):
+    """Register a model family under ``name`` (used as the result label)."""
+    def decorator(func):
+        FAMILIES[name] = func
+        return func
+    return decorator
+
+
+@register_family("Optimal SARIMA")
+def sarima_family(ts, exog, steps, candidates=None):
+    best = forecasting.grid_search(ts, candidates=candidates)
+    results = best["results"]
+    future_dates = forecasting.future_index(ts, steps)
+    return {
+        "fitted": results.fittedvalues,
+        "forecast": results.predict(start=future_dates[0], end=future_dates[-1]),
+        "aic": best["aic"],
+        "params": {"order": best["order"], "seasonal_order": best["seasonal_order"]},
+        "model": results,
+    }
+
+
+@register_family("SARIMAX (with Exog)")
+def sarimax_family(ts, exog, steps, candidates=None):
+    if exog is None:
+        raise ValueError("SARIMAX needs exogenous variables")
+    best = forecasting.grid_search(ts, exog=exog, candidates=candidates)
+    results = best["results"]
+    future_dates = forecasting.future_index(ts, steps)
+    return {
+        "fitted": results.fittedvalues,
+        "forecast": results.predict(start=future_dates[0], end=future_dates[-1],
+                                    exog=forecasting.future_exog(exog, steps)),
+        "aic": best["aic"],
+        "params": {"order": best["order"], "seasonal_order": best["seasonal_order"],
+                   "exog": list(exog.columns)},
+        "model": results,
+    }
+
+
+@register_family("Prophet")
+def prophet_family(ts, exog, steps, candidates=None):
+    _, fitted, forecast = forecasting.fit_prophet(ts, steps)
+    return {"fitted": fitted, "forecast": forecast}
+
+
+@dataclass
+class ModelResult:
+    """Outcome of one family. ``status`` is ok, error, timeout or skipped."""
+
+    name: str
+    status: str
+    rmse: float = float("nan")
+    mae: float = float("nan")
+    aic: float = float("nan")
+    elapsed: float = 0.0
+    params: dict = field(default_factory=dict)
+    fitted: pd.Series = None
+    forecast: pd.Series = None
+    # Fitted model of the family (e.g. SARIMAX results), for diagnostics
+    model: object = None
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+
+@dataclass
+class TournamentResult:
+    results: list
+    wall_time: float
+
+    @property
+    def best(self):
+        """The successful model with the lowest RMSE, or None."""
+        ranked = self.ranked()
+        return ranked[0] if ranked else None
+
+    def ranked(self):
+        """Successful models ordered by RMSE, then MAE."""
+        return sorted((r for r in self.results if r.ok), key=lambda r: (r.rmse, r.mae))
+
+    def __getitem__(self, name):
+        for result in self.results:
+            if result.name == name:
+                return result
+        raise KeyError(name)
+
+    def to_frame(self):
+        """One row per family with its metrics, sorted best first."""
+        rows = [{"Model": r.name, "Status": r.status, "RMSE": r.rmse, "MAE": r.mae,
+                 "AIC": r.aic, "Seconds": r.elapsed, "Error": r.error}
+                for r in self.results]
+        return (pd.DataFrame(rows)
+                .sort_values(["RMSE", "MAE"], na_position="last")
+                .reset_index(drop=True))
+
+
+def _run_family(conn, name, func, ts, exog, steps, candidates):
+    """Worker process entry point: fit one family and send back a ModelResult."""
+    start = time.perf_counter()
+    try:
+        output = func(ts, exog, steps, candidates)
+        rmse, mae = forecasting.fit_metrics(ts, output["fitted"])
+        result = ModelResult(name=name, status="ok", rmse=rmse, mae=mae,
+                             aic=output.get("aic", float("nan")),
+                             params=output.get("params", {}),
+                             fitted=output["fitted"], forecast=output["forecast"],
+                             model=output.get("model"))
+    except ImportError as e:
+        # Optional dependency (e.g. prophet) is not installed
+        result = ModelResult(name=name, status="skipped", error=str(e))
+    except Exception as e:
+        result = ModelResult(name=name, status="error", error=f"{type(e).__name__}: {e}")
+    result.elapsed = time.perf_counter() - start
+    conn.send(result)
+    conn.close()
+
+
+def _stop(proc):
+    proc.terminate()
+    proc.join(1)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+
+
+def run_tournament(ts, exog=None, families=None, steps=forecasting.FORECAST_STEPS,
+                   time_budget=DEFAULT_TIME_BUDGET, max_workers=None, candidates=None):
+    """Fit the given families concurrently and return a TournamentResult.
+
+    ``families`` is a list of registered names (default: all of them).
+    ``candidates`` are the SARIMA orders the SARIMA families search
+    (default: the full grid).
+    ``time_budget`` is the wall-clock limit for each family in seconds.
+    ``max_workers`` caps how many families fit at once (default: all).
+    """
+    names = list(FAMILIES) if families is None else list(families)
+    max_workers = max_workers or len(names)
+
+    # spawn keeps workers independent of the parent's threads (Streamlit runs many)
+    ctx = multiprocessing.get_context("spawn")
+    pending = list(names)
+    running = {}  # receiving connection -> (name, process, deadline)
+    results = {}
+    start = time.perf_counter()
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            name = pending.pop(0)
+            recv_conn, send_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_run_family,
+                               args=(send_conn, name, FAMILIES[name], ts, exog, steps, candidates),
+                               daemon=True)
+            proc.start()
+            send_conn.close()
+            running[recv_conn] = (name, proc, time.monotonic() + time_budget)
+
+        timeout = max(0.0, min(deadline for _, _, deadline in running.values()) - time.monotonic())
+        for conn in wait(list(running), timeout=timeout):
+            name, proc, _ = running.pop(conn)
+            try:
+                results[name] = conn.recv()
+            except EOFError:
+                results[name] = ModelResult(name=name, status="error",
+                                            error=f"worker exited with code {proc.exitcode}")
+            conn.close()
+            proc.join()
+
+        now = time.monotonic()
+        for conn, (name, proc, deadline) in list(running.items()):
+            if now >= deadline:
+                _stop(proc)
+                conn.close()
+                del running[conn]
+                results[name] = ModelResult(name=name, status="timeout", elapsed=time_budget,
+                                            error=f"exceeded {time_budget:.0f}s budget")
+
+    return TournamentResult(results=[results[name] for name in names],
+                            wall_time=time.perf_counter() - start)
@@ -0,0 +1,143 @@
+"""Fitting and prediction of the forests with core-aware parallelism.
+
+scikit-learn's forests default to ``n_jobs=None``, i.e. one core. Models
+fit through :func:`fit` use every core this process may run on (its CPU
+affinity and cgroup quota, or the FLOODCODE_N_JOBS environment variable),
+and keep that setting for prediction. :func:`predict_proba` and
+:func:`predict` split very large batches into chunks, so the per-tree
+probability arrays of a forest never exceed a chunk's rows::
+
+    model = fit(RandomForestClassifier(random_state=42), X_train, y_train)
+    probabilities = predict_proba(model, X_new)
+    throughput.summary()   # trees/s of the fits, rows/s of the predictions
+
+Every call is also recorded as an instrumentation stage, and every fit
+gives the model a new ``fit_version_``, so results derived from a model
+(e.g. its feature importances) can be cached per version.
+"""
+
+import math
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from floodcode.instrument import stage
+
+# Rows predicted at once; larger batches are split
+PREDICT_CHUNK_ROWS = 100_000
+
+# Throughput records kept before the oldest are dropped
+MAX_RECORDS = 1000
+
+
+def _cgroup_cores():
+    """CPU limit of the container (cgroup v2 ``cpu.max``), or None when unlimited."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return max(1, math.ceil(int(quota) / int(period)))
+
+
+def available_cores():
+    """Cores this process may use: FLOODCODE_N_JOBS, else its affinity capped by the cgroup quota."""
+    configured = os.environ.get("FLOODCODE_N_JOBS")
+    if configured:
+        return max(1, int(configured))
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    quota = _cgroup_cores()
+    return min(cores, quota) if quota else cores
+
+
+def n_jobs_for(model):
+    """Parallel jobs worth giving ``model``: the available cores, but no more than its trees."""
+    return max(1, min(available_cores(), getattr(model, "n_estimators", 1)))
+
+
+class Throughput:
+    """Thread-safe log of fit and predict speeds."""
+
+    def __init__(self, max_records=MAX_RECORDS):
+        self._records = []
+        self.max_records = max_records
+        self._lock = threading.Lock()
+
+    def add(self, kind, model, rows, seconds, n_jobs):
+        trees = getattr(model, "n_estimators", None)
+        with self._lock:
+            self._records.append({"kind": kind, "model": type(model).__name__, "rows": rows, "trees": trees,
+                                  "seconds": seconds, "n_jobs": n_jobs})
+            del self._records[:-self.max_records]
+
+    def to_frame(self):
+        with self._lock:
+            return pd.DataFrame(self._records, columns=["kind", "model", "rows", "trees", "seconds", "n_jobs"])
+
+    def summary(self):
+        """Total rows, trees and seconds per kind and model, with trees/s (fit) and rows/s (predict)."""
+        frame = self.to_frame()
+        if frame.empty:
+            return pd.DataFrame(columns=["calls", "rows", "trees", "seconds", "rows_per_second",
+                                         "trees_per_second"])
+        summary = frame.groupby(["kind", "model"]).agg(calls=("rows", "size"), rows=("rows", "sum"),
+                                                       trees=("trees", "sum"), seconds=("seconds", "sum"))
+        seconds = summary["seconds"].where(summary["seconds"] > 0)
+        summary["rows_per_second"] = summary["rows"] / seconds
+        summary["trees_per_second"] = (summary["trees"] / seconds).where(
+            summary.index.get_level_values("kind") == "fit")
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+throughput = Throughput()
+
+
+def fit(model, X, y, n_jobs=None):
+    """Fit ``model`` with ``n_jobs`` (default: :func:`n_jobs_for`) and return it."""
+    if n_jobs is None:
+        n_jobs = n_jobs_for(model)
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    with stage(f"fit {type(model).__name__}", rows=len(X)):
+        start = time.perf_counter()
+        model.fit(X, y)
+        throughput.add("fit", model, len(X), time.perf_counter() - start, n_jobs)
+    model.fit_version_ = uuid.uuid4().hex
+    return model
+
+
+def _chunked(method, model, X, chunk_rows):
+    n_jobs = getattr(model, "n_jobs", None) or 1
+    with stage(f"{method} {type(model).__name__}", rows=len(X)):
+        start = time.perf_counter()
+        if len(X) <= chunk_rows:
+            result = getattr(model, method)(X)
+        else:
+            rows = X.iloc if hasattr(X, "iloc") else X
+            result = np.concatenate([getattr(model, method)(rows[start_row:start_row + chunk_rows])
+                                     for start_row in range(0, len(X), chunk_rows)])
+        throughput.add("predict", model, len(X), time.perf_counter() - start, n_jobs)
+    return result
+
+
+def predict_proba(model, X, chunk_rows=PREDICT_CHUNK_ROWS):
+    """``model.predict_proba(X)``, at most ``chunk_rows`` rows at a time."""
+    return _chunked("predict_proba", model, X, chunk_rows)
+
+
+def predict(model, X, chunk_rows=PREDICT_CHUNK_ROWS):
+    """``model.predict(X)``, at most ``chunk_rows`` rows at a time."""
+    return _chunked("predict", model, X, chunk_rows)
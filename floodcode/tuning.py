@@ -0,0 +1,206 @@
+"""RandomForest hyperparameter tuning with successive halving and Hyperband.
+
+A full grid over trees, depth, leaf size and class weights fits every
+candidate on all the data with all the trees. Successive halving instead
+scores many candidates cheaply (few trees on a stratified fraction of the
+rows), keeps the best third and repeats with three times the budget until
+the survivors use every tree on all the rows. Hyperband runs several such
+brackets that start at different budgets, so a candidate that only shines
+with enough data still gets a chance::
+
+    result = tune_forest(X_train, y_train)
+    result.model         # best candidate refit on all of X_train, y_train
+    result.report        # one row per evaluation, with its cost
+
+Candidates are scored with stratified cross-validation (macro F1, so rare
+severity levels count as much as common ones); the candidates of a rung are
+evaluated in parallel worker processes, one per core the process may use
+(``training.available_cores``), the same budget as fitting.
+"""
+
+import itertools
+import math
+import multiprocessing
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from floodcode import training
+from floodcode.models import RANDOM_STATE
+
+# Candidate hyperparameters of the forest
+PARAM_GRID = {
+    "max_depth": [None, 8, 16],
+    "min_samples_leaf": [1, 2, 5],
+    "class_weight": [None, "balanced", "balanced_subsample"],
+    "max_features": ["sqrt", 0.3],
+}
+
+# Trees and share of the rows of the largest budget, and the smallest share used
+MAX_TREES = 200
+MIN_FRACTION = 1 / 9
+
+# Budget multiplier between rungs; 1 / ETA of the candidates survive each rung
+ETA = 3
+
+CV_FOLDS = 3
+
+# Fewest trees a cheap evaluation fits
+MIN_TREES = 10
+
+
+@dataclass
+class TuningResult:
+    """Best hyperparameters, their CV score, the refit model and the cost report."""
+
+    params: dict
+    score: float
+    model: object
+    report: pd.DataFrame
+    wall: float
+
+    def cost_summary(self):
+        """Totals of the report, next to what a full grid at the largest budget would cost."""
+        report = self.report
+        full_budget = report[report["fraction"] == report["fraction"].max()]
+        seconds_per_tree = (full_budget["fit_seconds"].sum() / full_budget["trees"].sum()
+                            if len(full_budget) else float("nan"))
+        grid_trees = report.attrs["grid_size"] * report.attrs["max_trees"] * CV_FOLDS
+        return {
+            "evaluations": len(report),
+            "candidates": report["candidate"].nunique(),
+            "trees_trained": int(report["trees"].sum()),
+            "fit_seconds": float(report["fit_seconds"].sum()),
+            "wall_seconds": self.wall,
+            "full_grid_trees": grid_trees,
+            "full_grid_seconds_estimate": float(grid_trees * seconds_per_tree),
+        }
+
+
+def param_grid(grid=None):
+    """Every combination of ``grid`` (default: :data:`PARAM_GRID`) as a list of dicts."""
+    grid = grid or PARAM_GRID
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+
+def stratified_subsample(y, fraction, rng, min_per_class=CV_FOLDS):
+    """Row positions of a ``fraction`` of ``y`` with every class kept in proportion.
+
+    Each class keeps at least ``min_per_class`` rows (or all it has), so the
+    subsample can still be split into stratified folds.
+    """
+    if fraction >= 1:
+        return np.arange(len(y))
+    codes, _ = pd.factorize(y)
+    positions = []
+    for code in range(codes.max() + 1):
+        members = np.flatnonzero(codes == code)
+        take = min(len(members), max(math.ceil(fraction * len(members)), min_per_class))
+        positions.append(rng.choice(members, take, replace=False))
+    return np.sort(np.concatenate(positions))
+
+
+# Training data of a worker process, sent once by the pool initializer
+_worker_data = {}
+
+
+def _init_worker(X, y):
+    _worker_data["X"], _worker_data["y"] = X, y
+
+
+def _evaluate(task):
+    """Cross-validated macro F1 of one candidate at one budget."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import StratifiedKFold
+
+    params, n_estimators, rows, seed = task
+    X, y = _worker_data["X"][rows], _worker_data["y"][rows]
+    scores, fit_seconds = [], 0.0
+    with warnings.catch_warnings():
+        # Rare classes may have fewer members than folds in small fractions
+        warnings.simplefilter("ignore", UserWarning)
+        folds = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=seed).split(X, y)
+        for train, test in folds:
+            model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed, n_jobs=1, **params)
+            start = time.process_time()
+            model.fit(X[train], y[train])
+            fit_seconds += time.process_time() - start
+            scores.append(f1_score(y[test], model.predict(X[test]), average="macro", zero_division=0))
+    return float(np.mean(scores)), float(np.std(scores)), fit_seconds
+
+
+def hyperband_brackets(eta=ETA, min_fraction=MIN_FRACTION):
+    """``(candidates, first_rung)`` per bracket, the most aggressive bracket first."""
+    s_max = int(round(math.log(1 / min_fraction, eta)))
+    return [(math.ceil((s_max + 1) / (s + 1) * eta ** s), s_max - s) for s in range(s_max, -1, -1)]
+
+
+def tune_forest(X, y, grid=None, hyperband=True, max_trees=MAX_TREES, eta=ETA, min_fraction=MIN_FRACTION,
+                max_workers=None, random_state=RANDOM_STATE, progress=None):
+    """Tune a RandomForestClassifier on ``X``/``y`` and refit the best candidate.
+
+    With ``hyperband=False`` only the most aggressive bracket runs, which is
+    plain successive halving. ``progress(bracket, rung, survivors)`` is
+    called after every rung.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    started = time.perf_counter()
+    candidates = param_grid(grid)
+    X_values = np.asarray(X, dtype=np.float32)
+    y_values = np.asarray(y)
+    rng = np.random.default_rng(random_state)
+    s_max = int(round(math.log(1 / min_fraction, eta)))
+    brackets = hyperband_brackets(eta, min_fraction)
+    if not hyperband:
+        brackets = brackets[:1]
+
+    max_workers = max_workers or training.available_cores()
+    pool = None
+    if max_workers > 1:
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(X_values, y_values))
+    else:
+        _init_worker(X_values, y_values)
+
+    rows = []
+    try:
+        for bracket, (n_candidates, first_rung) in enumerate(brackets):
+            picked = rng.choice(len(candidates), min(n_candidates, len(candidates)), replace=False)
+            survivors = list(picked)
+            for rung in range(first_rung, s_max + 1):
+                fraction = min(1.0, eta ** (rung - s_max))
+                n_estimators = max(MIN_TREES, round(max_trees * fraction))
+                sample = stratified_subsample(y_values, fraction, rng)
+                tasks = [(candidates[index], n_estimators, sample, random_state) for index in survivors]
+                results = list(pool.map(_evaluate, tasks)) if pool else [_evaluate(task) for task in tasks]
+                for index, (score, score_std, fit_seconds) in zip(survivors, results):
+                    rows.append({"bracket": bracket, "rung": rung, "candidate": int(index),
+                                 **{f"param_{name}": value for name, value in candidates[index].items()},
+                                 "n_estimators": n_estimators, "fraction": fraction, "rows": len(sample),
+                                 "score": score, "score_std": score_std, "trees": n_estimators * CV_FOLDS,
+                                 "fit_seconds": fit_seconds})
+                ranked = [index for _, index in sorted(zip((result[0] for result in results), survivors),
+                                                       key=lambda pair: -pair[0])]
+                survivors = ranked[:max(1, len(ranked) // eta)]
+                if progress is not None:
+                    progress(bracket, rung, len(survivors))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    report = pd.DataFrame(rows)
+    report.attrs["grid_size"] = len(candidates)
+    report.attrs["max_trees"] = max_trees
+    # The best score among the evaluations with every tree on all the rows
+    final = report[report["fraction"] == 1.0]
+    best = final.loc[final["score"].idxmax()]
+    params = candidates[int(best["candidate"])]
+    model = training.fit(RandomForestClassifier(n_estimators=max_trees, random_state=random_state, **params), X, y)
+    return TuningResult(params=params, score=float(best["score"]), model=model, report=report,
+                        wall=time.perf_counter() - started)
@@ -0,0 +1,161 @@
+"""Data-quality checks of the raw numeric columns.
+
+Every entry of 'Water Level', 'No. of Families affected' and the damage
+columns is classified as
+
+- ``clean``: already a plain number,
+- ``fixable``: becomes a number after known fixes (units such as ' ft.',
+  thousands separators, periods used as thousands separators like
+  '422.510.5' -> 4225105, stray spaces),
+- ``invalid``: anything else, or
+- ``missing``.
+
+The patterns run once per distinct value, not once per row, and the results
+are broadcast back with the value codes.
+"""
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from floodcode.cleaning import DAMAGE_COLS, NUMERIC_COLS
+
+STATUSES = ['clean', 'fixable', 'invalid', 'missing']
+
+NUMBER = re.compile(r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)")
+UNIT = re.compile(r"\s*ft\.?\s*$", re.IGNORECASE)
+MULTIPLE_PERIODS = re.compile(r"\d+(?:\.\d+){2,}")
+
+
+def _strip_unit(text):
+    return text.str.replace(UNIT, "", regex=True)
+
+
+def _drop_commas(text):
+    return text.str.replace(",", "", regex=False)
+
+
+def _drop_thousands_periods(text):
+    # Only values with two or more periods; '4.5' keeps its decimal point
+    mask = text.str.fullmatch(MULTIPLE_PERIODS).fillna(False)
+    return text.where(~mask, text.str.replace(".", "", regex=False))
+
+
+def _drop_spaces(text):
+    return text.str.replace(r"\s+", "", regex=True)
+
+
+# Fixes by name, applied in the order a column lists them
+FIXES = {
+    "unit": _strip_unit,
+    "thousands_comma": _drop_commas,
+    "thousands_period": _drop_thousands_periods,
+    "spaces": _drop_spaces,
+}
+
+# Fixes of the damage columns, also applied by ``cleaning.clean_damage``
+DAMAGE_FIXES = ["thousands_comma", "thousands_period", "spaces"]
+
+COLUMN_FIXES = {
+    'Water Level': ["unit", "spaces"],
+    'No. of Families affected': ["thousands_comma", "spaces"],
+    **{col: DAMAGE_FIXES for col in DAMAGE_COLS},
+}
+
+
+def validate_column(values, fixes=()):
+    """Classify the entries of one raw column.
+
+    Returns a DataFrame on ``values``' index with the ``status`` of each
+    entry, its numeric ``fixed`` value (NaN when invalid or missing) and the
+    ``fix`` rules that changed it.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        missing = values.isna().to_numpy()
+        return pd.DataFrame({
+            "status": pd.Categorical(np.where(missing, 'missing', 'clean'), categories=STATUSES),
+            "fixed": values.astype(float).to_numpy(),
+            "fix": "",
+        }, index=values.index)
+
+    # Work on the distinct values; code -1 marks missing entries
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+
+    status = np.full(len(text), 'invalid', dtype=object)
+    status[(text == "").to_numpy()] = 'missing'
+    clean = text.str.fullmatch(NUMBER).to_numpy(dtype=bool)
+    status[clean] = 'clean'
+
+    candidates = text[status == 'invalid']
+    applied = pd.Series("", index=candidates.index, dtype=object)
+    for name in fixes:
+        fixed_candidates = FIXES[name](candidates)
+        changed = fixed_candidates != candidates
+        applied[changed] = applied[changed] + ", " + name
+        candidates = fixed_candidates
+    fixable = candidates.str.fullmatch(NUMBER)
+    status[candidates.index[fixable]] = 'fixable'
+
+    fixed_text = text.where(clean, None)
+    fixed_text[candidates.index[fixable]] = candidates[fixable]
+    fixed = pd.to_numeric(fixed_text, errors="coerce").to_numpy(dtype=float)
+    fix = np.full(len(text), "", dtype=object)
+    fix[candidates.index[fixable]] = applied[fixable].str.lstrip(", ")
+
+    has_value = codes >= 0
+    row_status = np.full(len(codes), 'missing', dtype=object)
+    row_status[has_value] = status[codes[has_value]]
+    row_fixed = np.full(len(codes), np.nan)
+    row_fixed[has_value] = fixed[codes[has_value]]
+    row_fix = np.full(len(codes), "", dtype=object)
+    row_fix[has_value] = fix[codes[has_value]]
+
+    return pd.DataFrame({
+        "status": pd.Categorical(row_status, categories=STATUSES),
+        "fixed": row_fixed,
+        "fix": row_fix,
+    }, index=values.index)
+
+
+@dataclass
+class ValidationResult:
+    statuses: pd.DataFrame
+    fixed: pd.DataFrame
+    quarantine: pd.DataFrame
+
+    def summary(self):
+        """Number of entries per column and status."""
+        return self.statuses.apply(lambda col: col.value_counts().reindex(STATUSES, fill_value=0)).T
+
+
+def validate(df, columns=NUMERIC_COLS):
+    """Validate the raw numeric columns of ``df``.
+
+    ``quarantine`` lists every fixable or invalid entry with its row, column,
+    raw value, status, inferred fix and fixed value, for review. Cleaning
+    applies the same fixes to the damage columns (``DAMAGE_FIXES``).
+    """
+    statuses, fixed, quarantined = {}, {}, []
+    for col in columns:
+        if col not in df.columns:
+            continue
+        checked = validate_column(df[col], COLUMN_FIXES.get(col, ["spaces"]))
+        statuses[col] = checked["status"]
+        fixed[col] = checked["fixed"]
+        flagged_mask = checked["status"].isin(['fixable', 'invalid']).to_numpy()
+        flagged = checked[flagged_mask]
+        quarantined.append(pd.DataFrame({
+            "row": flagged.index,
+            "column": col,
+            "value": df[col].to_numpy()[flagged_mask],
+            "status": flagged["status"].astype(str).to_numpy(),
+            "fix": flagged["fix"].to_numpy(),
+            "fixed": flagged["fixed"].to_numpy(),
+        }))
+    quarantine = (pd.concat(quarantined, ignore_index=True) if quarantined
+                  else pd.DataFrame(columns=["row", "column", "value", "status", "fix", "fixed"]))
+    return ValidationResult(pd.DataFrame(statuses, index=df.index), pd.DataFrame(fixed, index=df.index),
+                            quarantine)
@@ -0,0 +1,30 @@
+"""End-to-end run of the headless batch analysis (see floodcode.batch)."""
+
+import json
+import os
+
+import pandas as pd
+
+from floodcode import batch, synthetic
+
+ROWS = 2_000
+
+OUTPUTS = ["cleaned.parquet", "monthly_risk.parquet", "municipal_risk.parquet", "monthly_predictions.parquet",
+           "cluster_summary.parquet", "forecast.parquet", "summary.json"]
+
+
+def test_batch_writes_every_output(tmp_path):
+    input_dir, out_dir = tmp_path / "input", tmp_path / "results"
+    input_dir.mkdir()
+    for seed in range(2):
+        synthetic.generate(ROWS, seed=seed).to_csv(input_dir / f"floods_{seed}.csv", index=False)
+
+    summaries, summary = batch.run_batch(batch.find_inputs(input_dir), out_dir, max_workers=1)
+
+    assert [s.get("error") for s in summaries] == [None, None]
+    assert summary["failed"] == [] and summary["files"] == 2 and summary["rows"] == 2 * ROWS
+    for seed in range(2):
+        file_dir = out_dir / f"floods_{seed}"
+        assert sorted(os.listdir(file_dir)) == sorted(OUTPUTS)
+        assert len(pd.read_parquet(file_dir / "cleaned.parquet")) == ROWS
+    assert json.loads((out_dir / "batch_summary.json").read_text())["files"] == 2
@@ -0,0 +1,23 @@
+"""Peak memory of the preprocessing path (see floodcode.memcheck)."""
+
+import pytest
+
+from floodcode import memcheck, synthetic
+
+ROWS = 50_000
+
+
+def test_preprocessing_stays_within_peak_ratio():
+    raw = synthetic.generate(rows=ROWS)
+    input_bytes = raw.memory_usage(index=True, deep=True).sum()
+
+    ratio = memcheck.check_preprocessing(raw)
+
+    assert 0 < ratio <= memcheck.MAX_PEAK_RATIO + memcheck.SLACK_BYTES / input_bytes
+
+
+def test_preprocessing_over_the_limit_raises():
+    raw = synthetic.generate(rows=ROWS)
+
+    with pytest.raises(RuntimeError, match="preprocessing peaked at"):
+        memcheck.check_preprocessing(raw, max_ratio=0.01)